@@ -1,9 +1,11 @@
 # import Libraries of other lib packages
 import bob.core
 
-# import our own Library
+# import our own Library (only once, even if this module gets reloaded)
 import bob.extension
-bob.extension.load_bob_library('bob.math', __file__)
+if not globals().get('_library_loaded', False):
+  bob.extension.load_bob_library('bob.math', __file__)
+  _library_loaded = True
 
 from ._library import *
 from . import version
@@ -11,10 +13,54 @@ from .version import module as __version__
 from .version import api as __api_version__
 
 
+_config = None
+
 def get_config():
   """Returns a string containing the configuration information.
   """
-  return bob.extension.get_config(__name__, version.externals, version.api)
+  # the package metadata lookup is slow and its result cannot change
+  global _config
+  if _config is None:
+    _config = _build_config()
+  return _config
+
+
+def _build_config():
+  """Builds the configuration string from the installed package metadata.
+
+  Uses :py:mod:`importlib.metadata`, which only reads the metadata of this
+  package and its direct dependencies, instead of resolving the whole working
+  set through ``pkg_resources``. Requirements whose environment marker does not
+  apply (e.g. those of extras) are not listed.
+  """
+  from importlib.metadata import distribution, PackageNotFoundError
+  from packaging.requirements import Requirement
+
+  this = distribution(__name__)
+  retval = "%s: %s [api=0x%04x] (%s)\n" % (this.metadata['Name'],
+      this.version, version.api, this.locate_file(''))
+
+  retval += "* C/C++ dependencies:\n"
+  for k in sorted(version.externals):
+    retval += "  - %s: %s\n" % (k, version.externals[k])
+
+  deps = {}
+  for requirement in this.requires or []:
+    requirement = Requirement(requirement)
+    if requirement.marker is not None and \
+        not requirement.marker.evaluate({'extra': ''}):
+      continue
+    try:
+      dep = distribution(requirement.name)
+    except PackageNotFoundError:
+      continue
+    deps[dep.metadata['Name']] = "  - %s: %s (%s)\n" % (dep.metadata['Name'],
+        dep.version, dep.locate_file(''))
+  if deps:
+    retval += "* Python dependencies:\n" + \
+        ''.join(deps[k] for k in sorted(deps, key=str.lower))
+
+  return retval.strip()
 
 
 # gets sphinx autodoc done right - don't remove it
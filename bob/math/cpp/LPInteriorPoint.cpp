@@ -51,6 +51,9 @@ void bob::math::LPInteriorPoint::resetCache()
   m_cache_A_large.resize(m_M+2*m_N, m_M+2*m_N);
   m_cache_b_large.resize(m_M+2*m_N);
   m_cache_x_large.resize(m_M+2*m_N);
+  // LAPACK buffers, reused by all the linear systems solved in the iterations
+  m_cache_A_lapack.resize(m_M+2*m_N, m_M+2*m_N);
+  m_cache_ipiv.resize(m_M+2*m_N);
 }
 
 bob::math::LPInteriorPoint& bob::math::LPInteriorPoint::operator=(
@@ -252,12 +255,14 @@ void bob::math::LPInteriorPoint::centeringV(const blitz::Array<double,2>& A,
 
     // 2) Update the big system and solve it
     updateLargeSystem( x, 1., m);
-    bob::math::linsolve( m_cache_A_large, m_cache_b_large, m_cache_x_large);
+    bob::math::linsolve_(m_cache_A_large, m_cache_b_large, m_cache_x_large,
+      m_cache_A_lapack, m_cache_ipiv);
 
     // 4) Find alpha and update x, lamda and mu
+    // (only x and mu constrain the step length, lambda is updated once
+    // alpha is known)
     double alpha=1.;
     do {
-      m_cache_lambda = m_lambda + alpha * m_cache_x_large(r_m+n);
       m_cache_x = x + alpha * m_cache_x_large(r_n);
       m_cache_mu = m_mu + alpha * m_cache_x_large(r_n+m+n);
       alpha /= 2.;
@@ -265,7 +270,7 @@ void bob::math::LPInteriorPoint::centeringV(const blitz::Array<double,2>& A,
         throw std::runtime_error("alpha is smaller than 2*epsilon<double>");
     } while ( !(blitz::all(m_cache_x >= 0.) && blitz::all(m_cache_mu >= 0.)) );
     // Move content back
-    m_lambda = m_cache_lambda;
+    m_lambda += (2.*alpha) * m_cache_x_large(r_m+n);
     x = m_cache_x;
     m_mu = m_cache_mu;
 
@@ -406,7 +411,8 @@ void bob::math::LPInteriorPointShortstep::solve(const blitz::Array<double,2>& A,
 
     // 2) Update the big system and solve it
     updateLargeSystem( x, sigma, m);
-    bob::math::linsolve( m_cache_A_large, m_cache_b_large, m_cache_x_large);
+    bob::math::linsolve_(m_cache_A_large, m_cache_b_large, m_cache_x_large,
+      m_cache_A_lapack, m_cache_ipiv);
 
     // 3) Update x, lamda and mu
     m_lambda += m_cache_x_large( r_m+n);
@@ -527,7 +533,8 @@ void bob::math::LPInteriorPointPredictorCorrector::solve(const blitz::Array<doub
 
     // 2) Update the big system and solve it
     updateLargeSystem( x, 0., m);
-    bob::math::linsolve( m_cache_A_large, m_cache_b_large, m_cache_x_large);
+    bob::math::linsolve_(m_cache_A_large, m_cache_b_large, m_cache_x_large,
+      m_cache_A_lapack, m_cache_ipiv);
 
     // 3) alpha=1
     double alpha = 1.;
@@ -560,7 +567,8 @@ void bob::math::LPInteriorPointPredictorCorrector::solve(const blitz::Array<doub
 
     // 7) Update the big system and solve it
     updateLargeSystem( x, 1., m);
-    bob::math::linsolve( m_cache_A_large, m_cache_b_large, m_cache_x_large);
+    bob::math::linsolve_(m_cache_A_large, m_cache_b_large, m_cache_x_large,
+      m_cache_A_lapack, m_cache_ipiv);
 
     // 8) Update x
     m_lambda += m_cache_x_large(r_m+n);
@@ -690,7 +698,8 @@ void bob::math::LPInteriorPointLongstep::solve(const blitz::Array<double,2>& A,
 
     // 2) Update the big system and solve it
     updateLargeSystem(x, m_sigma, m);
-    bob::math::linsolve(m_cache_A_large, m_cache_b_large, m_cache_x_large);
+    bob::math::linsolve_(m_cache_A_large, m_cache_b_large, m_cache_x_large,
+      m_cache_A_lapack, m_cache_ipiv);
 
     // 3) alpha=1
     double alpha = 1.;
@@ -6,7 +6,6 @@
  */
 
 #include <stdexcept>
-#include <boost/shared_array.hpp>
 
 #include <bob.math/gsvd.h>
 
@@ -52,6 +51,24 @@ void bob::math::gsvd( blitz::Array<double,2>& A,
                       blitz::Array<double,2>& X,
                       blitz::Array<double,2>& C,
                       blitz::Array<double,2>& S)
+{
+  blitz::Array<double,1> work;
+  blitz::Array<int,1> iwork;
+  bob::math::gsvd(A, B, U, V, zeroR, Q, X, C, S, work, iwork);
+}
+
+
+void bob::math::gsvd( blitz::Array<double,2>& A,
+                      blitz::Array<double,2>& B,
+                      blitz::Array<double,2>& U,
+                      blitz::Array<double,2>& V,
+                      blitz::Array<double,2>& zeroR,
+                      blitz::Array<double,2>& Q,
+                      blitz::Array<double,2>& X,
+                      blitz::Array<double,2>& C,
+                      blitz::Array<double,2>& S,
+                      blitz::Array<double,1>& work,
+                      blitz::Array<int,1>& iwork)
 {
   const char jobu = 'U';
   const char jobv = 'V';
@@ -102,46 +119,53 @@ void bob::math::gsvd( blitz::Array<double,2>& A,
   blitz::Array<double,1> S_1d(N); S_1d = 0;
   double *S_lapack = S_1d.data();
 
-  const int lwork_query = -1;
-  double work_query;
-
-  boost::shared_array<int> iwork(new int[N]);
+  // An empty workspace is queried and allocated below; a too small integer
+  // workspace is reallocated
+  if (work.extent(0) > 0) bob::core::array::assertCZeroBaseContiguous(work);
+  if (iwork.extent(0) >= N) bob::core::array::assertCZeroBaseContiguous(iwork);
+  else iwork.resize(N);
 
   int info = 0;
-  // A/ Queries the optimal size of the working array
-  
-  dggsvd3_(&jobu,
-          &jobv, 
-          &jobq,
-          &M,
-          &N,
-          &P,
-          &K,
-          &L,
-          A_lapack, 
-          &lda, 
-          B_lapack, 
-          &ldb,
-          C_lapack,
-          S_lapack,
-          U_lapack,
-          &ldu, 
-          V_lapack,
-          &ldv, 
-          Q_lapack,
-          &ldq, 
-          &work_query,
-          &lwork_query,
-          iwork.get(),
-          &info);
-          
-  if (info != 0)
-    throw std::runtime_error("The LAPACK dggsvd3 function returned a non-zero value during the checking");
+  // A/ Queries the optimal size of the working array, unless a workspace of
+  // non-zero size is given, in which case it is used as is
+  if (work.extent(0) == 0) {
+    const int lwork_query = -1;
+    double work_query;
+
+    dggsvd3_(&jobu,
+            &jobv, 
+            &jobq,
+            &M,
+            &N,
+            &P,
+            &K,
+            &L,
+            A_lapack, 
+            &lda, 
+            B_lapack, 
+            &ldb,
+            C_lapack,
+            S_lapack,
+            U_lapack,
+            &ldu, 
+            V_lapack,
+            &ldv, 
+            Q_lapack,
+            &ldq, 
+            &work_query,
+            &lwork_query,
+            iwork.data(),
+            &info);
+            
+    if (info != 0)
+      throw std::runtime_error("The LAPACK dggsvd3 function returned a non-zero value during the checking");
+
+    work.resize(static_cast<int>(work_query));
+  }
 
   // B/ Computes
   
-  const int lwork = static_cast<int>(work_query);
-  boost::shared_array<double> work(new double[lwork]);
+  const int lwork = work.extent(0);
   
   dggsvd3_(&jobu,
             &jobv, 
@@ -163,9 +187,9 @@ void bob::math::gsvd( blitz::Array<double,2>& A,
            &ldv, 
            Q_lapack,
            &ldq, 
-           work.get(),
+           work.data(),
            &lwork,
-           iwork.get(),
+           iwork.data(),
            &info);
   if (info != 0)
     throw std::runtime_error("The LAPACK dggsvd3 function returned a non-zero value during the computation.");
@@ -226,7 +250,7 @@ void bob::math::gsvd( blitz::Array<double,2>& A,
     // B - diag(C) part. Here the C is LxL
     // Swaping
     
-    bob::math::swap_(C_1d, iwork.get(), K, std::min(M,r));
+    bob::math::swap_(C_1d, iwork.data(), K, std::min(M,r));
     blitz::Array<double,2> C_diag (L,L); C_diag = 0;
     bob::math::diag(C_1d(blitz::Range(K,K+L-1)), C_diag);
     C(blitz::Range(K, M-1), blitz::Range(K, K+L-1)) = C_diag;
@@ -238,7 +262,7 @@ void bob::math::gsvd( blitz::Array<double,2>& A,
 
     // A - diag(S) part
     // Swap
-    bob::math::swap_(S_1d, iwork.get(), K, std::min(M,r));
+    bob::math::swap_(S_1d, iwork.data(), K, std::min(M,r));
     blitz::Array<double,2> S_diag (L,L); S_diag = 0;
     bob::math::diag(S_1d(blitz::Range(K,K+L-1)), S_diag);
     S(blitz::Range(0, L-1), blitz::Range(K, K+L-1)) = S_diag;
@@ -275,7 +299,7 @@ void bob::math::gsvd( blitz::Array<double,2>& A,
     // Swaping
     blitz::Array<double,1> C_1d_cropped(M-K); C_1d_cropped = 0;
     C_1d_cropped = C_1d(blitz::Range(K,K+M-1));
-    bob::math::swap_(C_1d_cropped, iwork.get(), K, std::min(M,r));
+    bob::math::swap_(C_1d_cropped, iwork.data(), K, std::min(M,r));
     blitz::Array<double,2> C_diag (M,M); C_diag = 0;
     bob::math::diag(C_1d_cropped, C_diag);
     C(blitz::Range(K,M-1), blitz::Range(K,M-1)) = C_diag;
@@ -299,7 +323,7 @@ void bob::math::gsvd( blitz::Array<double,2>& A,
     blitz::Array<double,1> S_1d_cropped(M-K); S_1d_cropped = 0;
     S_1d_cropped = S_1d(blitz::Range(K,K+M-1));
     
-    bob::math::swap_(S_1d_cropped, iwork.get(), K, std::min(M,r));
+    bob::math::swap_(S_1d_cropped, iwork.data(), K, std::min(M,r));
     blitz::Array<double,2> S_diag (M,M); S_diag = 0;
     bob::math::diag(S_1d_cropped, S_diag);
     S(blitz::Range(0,M-K-1), blitz::Range(K,M-1)) = S_diag;
@@ -315,15 +339,48 @@ void bob::math::gsvd( blitz::Array<double,2>& A,
   V = Vt;
 
   // Swaping U
-  bob::math::swap_(U, iwork.get(), K, std::min(M,r));
+  bob::math::swap_(U, iwork.data(), K, std::min(M,r));
   // Swaping V
-  bob::math::swap_(V, iwork.get(), K, std::min(M,r));
+  bob::math::swap_(V, iwork.data(), K, std::min(M,r));
 
   //Computing X
   bob::math::prod_(zeroR, Q, X);
   blitz::Array<double,2> Xt(
     bob::core::array::ccopy(const_cast<blitz::Array<double,2>&>(X).transpose(1,0)));
   X = Xt;
-  bob::math::swap_(X, iwork.get(), K, std::min(M,r));
+  bob::math::swap_(X, iwork.data(), K, std::min(M,r));
+
+}
+
+
+int bob::math::gsvd_work_size(const int M, const int N, const int P)
+{
+  const char jobu = 'U';
+  const char jobv = 'V';
+  const char jobq = 'Q';
+
+  const int lda = std::max(1,M);
+  const int ldb = std::max(1,P);
+  const int ldu = std::max(1,M);
+  const int ldv = std::max(1,P);
+  const int ldq = std::max(1,N);
+
+  int K = 0;
+  int L = 0;
+
+  // The matrices are not referenced by LAPACK during the workspace query
+  double dummy = 0.;
+  blitz::Array<int,1> iwork(std::max(1,N));
+  const int lwork_query = -1;
+  double work_query;
+  int info = 0;
+
+  dggsvd3_(&jobu, &jobv, &jobq, &M, &N, &P, &K, &L,
+           &dummy, &lda, &dummy, &ldb, &dummy, &dummy,
+           &dummy, &ldu, &dummy, &ldv, &dummy, &ldq,
+           &work_query, &lwork_query, iwork.data(), &info);
+  if (info != 0)
+    throw std::runtime_error("The LAPACK dggsvd3 function returned a non-zero value during the checking");
 
-} 
+  return static_cast<int>(work_query);
+}
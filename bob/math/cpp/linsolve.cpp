@@ -6,7 +6,6 @@
  */
 
 #include <stdexcept>
-#include <boost/shared_array.hpp>
 
 #include <bob.math/linsolve.h>
 
@@ -17,10 +16,64 @@
 #include <bob.core/array_copy.h>
 
 // Declaration of the external LAPACK function (Linear system solvers)
-extern "C" void dgesv_( const int *N, const int *NRHS, double *A,
-  const int *lda, int *ipiv, double *B, const int *ldb, int *info);
+extern "C" void dgetrf_( const int *M, const int *N, double *A,
+  const int *lda, int *ipiv, int *info);
+extern "C" void dgetrs_( const char *trans, const int *N, const int *NRHS,
+  const double *A, const int *lda, const int *ipiv, double *B,
+  const int *ldb, int *info);
 extern "C" void dposv_( const char* uplo, const int *N, const int *NRHS,
   double *A, const int *lda, double *B, const int *ldb, int *info);
+// Declaration of the external BLAS functions (Level 1 and 2)
+extern "C" double ddot_( const int *N, const double *X, const int *incx,
+  const double *Y, const int *incy);
+extern "C" void daxpy_( const int *N, const double *alpha, const double *X,
+  const int *incx, double *Y, const int *incy);
+extern "C" void dsymv_( const char *uplo, const int *N, const double *alpha,
+  const double *A, const int *lda, const double *X, const int *incx,
+  const double *beta, double *Y, const int *incy);
+
+/**
+ * Copies A into the given (C-contiguous, NxN) LAPACK buffer, following
+ * whichever of its C- or Fortran-style layouts is contiguous, so that the
+ * copy is a linear sweep over the memory instead of a transposition.
+ * Returns true if the buffer holds A in column-major order (as expected by
+ * LAPACK) and false if it holds transpose(A).
+ */
+static bool copyForLapack(const blitz::Array<double,2>& A,
+  blitz::Array<double,2>& A_lapack)
+{
+  // Ugly fix for old blitz version support
+  const blitz::Array<double,2> A_t =
+    const_cast<blitz::Array<double,2>&>(A).transpose(1,0);
+  if (bob::core::array::isCZeroBaseContiguous(A_t))
+  {
+    A_lapack = A_t;
+    return true;
+  }
+  A_lapack = A;
+  return false;
+}
+
+/**
+ * Solves the system with the LU decomposition of the matrix in A_lapack,
+ * which holds either A or transpose(A) in column-major order.
+ */
+static void solveLU(const bool A_colmajor, const int N, const int NRHS,
+  double* A_lapack, int* ipiv, double* X_lapack)
+{
+  int info = 0;
+  const int lda = N;
+  const int ldb = N;
+  const char trans = A_colmajor ? 'N' : 'T';
+
+  // Calls the LAPACK functions (dgetrf and dgetrs, which is what dgesv does)
+  dgetrf_( &N, &N, A_lapack, &lda, ipiv, &info );
+  if (info != 0)
+    throw std::runtime_error("The LAPACK dgetrf function returned a non-zero value.");
+  dgetrs_( &trans, &N, &NRHS, A_lapack, &lda, ipiv, X_lapack, &ldb, &info );
+  if (info != 0)
+    throw std::runtime_error("The LAPACK dgetrs function returned a non-zero value.");
+}
 
 void bob::math::linsolve(const blitz::Array<double,2>& A,
   const blitz::Array<double,1>& b, blitz::Array<double,1>& x)
@@ -40,17 +93,27 @@ void bob::math::linsolve(const blitz::Array<double,2>& A,
 
 void bob::math::linsolve_(const blitz::Array<double,2>& A,
   const blitz::Array<double,1>& b, blitz::Array<double,1>& x)
+{
+  blitz::Array<double,2> A_blitz_lapack;
+  blitz::Array<int,1> ipiv;
+  bob::math::linsolve_(A, b, x, A_blitz_lapack, ipiv);
+}
+
+void bob::math::linsolve_(const blitz::Array<double,2>& A,
+  const blitz::Array<double,1>& b, blitz::Array<double,1>& x,
+  blitz::Array<double,2>& A_blitz_lapack, blitz::Array<int,1>& ipiv)
 {
   // Defines dimensionality variables
   const int N = A.extent(0);
 
   // Prepares to call LAPACK function
-  // Initialises LAPACK arrays
-  boost::shared_array<int> ipiv(new int[N]);
-  // Transpose (C: row major order, Fortran: column major)
-  // Ugly fix for old blitz version support
-  blitz::Array<double,2> A_blitz_lapack(
-    bob::core::array::ccopy(const_cast<blitz::Array<double,2>&>(A).transpose(1,0)));
+  // Initialises LAPACK arrays, unless they already have the right size
+  if (ipiv.extent(0) != N)
+    ipiv.resize(N);
+  if (A_blitz_lapack.extent(0) != N || A_blitz_lapack.extent(1) != N)
+    A_blitz_lapack.resize(N, N);
+  // C: row major order, Fortran: column major
+  const bool A_colmajor = copyForLapack(A, A_blitz_lapack);
   double* A_lapack = A_blitz_lapack.data();
   // Tries to use X directly
   bool x_direct_use = bob::core::array::isCZeroBaseContiguous(x);
@@ -63,18 +126,8 @@ void bob::math::linsolve_(const blitz::Array<double,2>& A,
   else
     x_blitz_lapack.reference(bob::core::array::ccopy(b));
   double *x_lapack = x_blitz_lapack.data();
-  // Remaining variables
-  int info = 0;
-  const int lda = N;
-  const int ldb = N;
-  const int NRHS = 1;
 
-  // Calls the LAPACK function (dgesv(
-  dgesv_( &N, &NRHS, A_lapack, &lda, ipiv.get(), x_lapack, &ldb, &info );
-
-  // Check info variable
-  if (info != 0)
-    throw std::runtime_error("The LAPACK dgesv function returned a non-zero value.");
+  solveLU(A_colmajor, N, 1, A_lapack, ipiv.data(), x_lapack);
 
   // Copy result back to x if required
   if (!x_direct_use)
@@ -105,13 +158,12 @@ void bob::math::linsolve_(const blitz::Array<double,2>& A,
   const int N = A.extent(0);
   const int P = X.extent(1);
 
-  // Prepares to call LAPACK function (dgesv)
+  // Prepares to call LAPACK function (dgetrf/dgetrs)
   // Initialises LAPACK arrays
-  boost::shared_array<int> ipiv(new int[N]);
-  // Transpose (C: row major order, Fortran: column major)
-  // Ugly fix for old blitz version support
-  blitz::Array<double,2> A_blitz_lapack(
-    bob::core::array::ccopy(const_cast<blitz::Array<double,2>&>(A).transpose(1,0)));
+  blitz::Array<int,1> ipiv(N);
+  // C: row major order, Fortran: column major
+  blitz::Array<double,2> A_blitz_lapack(N, N);
+  const bool A_colmajor = copyForLapack(A, A_blitz_lapack);
   double* A_lapack = A_blitz_lapack.data();
   // Tries to use X directly
   blitz::Array<double,2> Xt = X.transpose(1,0);
@@ -127,18 +179,8 @@ void bob::math::linsolve_(const blitz::Array<double,2>& A,
     X_blitz_lapack.reference(
       bob::core::array::ccopy(const_cast<blitz::Array<double,2>&>(B).transpose(1,0)));
   double *X_lapack = X_blitz_lapack.data();
-  // Remaining variables
-  int info = 0;
-  const int lda = N;
-  const int ldb = N;
-  const int NRHS = P;
-
-  // Calls the LAPACK function (dgesv)
-  dgesv_( &N, &NRHS, A_lapack, &lda, ipiv.get(), X_lapack, &ldb, &info );
 
-  // Checks info variable
-  if (info != 0)
-    throw std::runtime_error("The LAPACK dgesdd function returned a non-zero value.");
+  solveLU(A_colmajor, N, P, A_lapack, ipiv.data(), X_lapack);
 
   // Copy result back to X if required
   if (!X_direct_use )
@@ -173,10 +215,10 @@ void bob::math::linsolveSympos_(const blitz::Array<double,2>& A,
 
   // Prepares to call LAPACK function
   // Initialises LAPACK arrays
-  // Transpose (C: row major order, Fortran: column major)
-  // Ugly fix for old blitz version support
-  blitz::Array<double,2> A_blitz_lapack(
-    bob::core::array::ccopy(const_cast<blitz::Array<double,2>&>(A).transpose(1,0)));
+  // C: row major order, Fortran: column major; as A is symmetric, only
+  // the triangle that is passed to LAPACK needs to be adapted
+  blitz::Array<double,2> A_blitz_lapack(N, N);
+  const bool A_colmajor = copyForLapack(A, A_blitz_lapack);
   double* A_lapack = A_blitz_lapack.data();
   // Tries to use X directly
   bool x_direct_use = bob::core::array::isCZeroBaseContiguous(x);
@@ -191,7 +233,7 @@ void bob::math::linsolveSympos_(const blitz::Array<double,2>& A,
   double *x_lapack = x_blitz_lapack.data();
   // Remaining variables
   int info = 0;
-  const char uplo = 'U';
+  const char uplo = A_colmajor ? 'U' : 'L';
   const int lda = N;
   const int ldb = N;
   const int NRHS = 1;
@@ -234,10 +276,10 @@ void bob::math::linsolveSympos_(const blitz::Array<double,2>& A,
 
   // Prepares to call LAPACK function (dposv)
   // Initialises LAPACK arrays
-  // Transpose (C: row major order, Fortran: column major)
-  // Ugly fix for old blitz version support
-  blitz::Array<double,2> A_blitz_lapack(
-    bob::core::array::ccopy(const_cast<blitz::Array<double,2>&>(A).transpose(1,0)));
+  // C: row major order, Fortran: column major; as A is symmetric, only
+  // the triangle that is passed to LAPACK needs to be adapted
+  blitz::Array<double,2> A_blitz_lapack(N, N);
+  const bool A_colmajor = copyForLapack(A, A_blitz_lapack);
   double* A_lapack = A_blitz_lapack.data();
   // Tries to use X directly
   blitz::Array<double,2> Xt = X.transpose(1,0);
@@ -255,7 +297,7 @@ void bob::math::linsolveSympos_(const blitz::Array<double,2>& A,
   double *X_lapack = X_blitz_lapack.data();
   // Remaining variables
   int info = 0;
-  const char uplo = 'U';
+  const char uplo = A_colmajor ? 'U' : 'L';
   const int lda = N;
   const int ldb = N;
   const int NRHS = P;
@@ -303,45 +345,69 @@ void bob::math::linsolveCGSympos_(const blitz::Array<double,2>& A,
 {
   // Dimensionality of the problem
   const int N = b.extent(0);
+  const int one = 1;
+  const char uplo = 'U';
+  const double d_one = 1., d_zero = 0., d_minus_one = -1.;
+
+  // A is symmetric, hence its C-style storage is also a valid Fortran-style
+  // one. We only need to make sure it is contiguous before handing it to BLAS
+  blitz::Array<double,2> A_blas;
+  if (bob::core::array::isCZeroBaseContiguous(A))
+    A_blas.reference(A);
+  else
+    A_blas.reference(bob::core::array::ccopy(A));
+  const double* A_ = A_blas.data();
 
-  blitz::Array<double,1> r(N), d(N), best_x(N), q(N), tmp(N);
-  x = 0.;
+  // All vectors are allocated once, the iterations update them in place
+  blitz::Array<double,1> x_blas(N), r(N), d(N), best_x(N), q(N);
+  x_blas = 0.;
   r = b;
   d = b;
+  double* x_ = x_blas.data();
+  double* r_ = r.data();
+  double* d_ = d.data();
+  double* q_ = q.data();
 
-  double delta = bob::math::dot(r,r);
-  double delta0 = bob::math::dot(b,b);
+  double delta = ddot_(&N, r_, &one, r_, &one);
+  const double delta0 = delta;
 
   int n_iter = 0;
-  best_x = x;
+  best_x = x_blas;
   double best_res = sqrt(delta / delta0);
 
   while (n_iter < max_iter && delta > acc*acc*delta0)
   {
     // q = A*d
-    bob::math::prod_(A, d, q);
+    dsymv_(&uplo, &N, &d_one, A_, &N, d_, &one, &d_zero, q_, &one);
 
     // alpha = delta/(d'*q);
-    double alpha = delta / bob::math::dot(d,q);
-    x = x + alpha * d;
+    double alpha = delta / ddot_(&N, d_, &one, q_, &one);
+    // x = x + alpha*d
+    daxpy_(&N, &alpha, d_, &one, x_, &one);
 
-    if (n_iter+1 % 50 == 0)
+    if ((n_iter+1) % 50 == 0)
     {
-      bob::math::prod(A,x,tmp);
-      r = b - tmp;
+      // r = b - A*x, recomputed from time to time to discard rounding errors
+      r = b;
+      dsymv_(&uplo, &N, &d_minus_one, A_, &N, x_, &one, &d_one, r_, &one);
     }
     else
-      r = r - alpha * q;
+    {
+      // r = r - alpha*q
+      const double minus_alpha = -alpha;
+      daxpy_(&N, &minus_alpha, q_, &one, r_, &one);
+    }
 
     double delta_old = delta;
-    delta = bob::math::dot(r,r);
+    delta = ddot_(&N, r_, &one, r_, &one);
     double beta = delta / delta_old;
-    d = r + beta * d;
+    // d = r + beta*d
+    for (int i=0; i<N; ++i) d_[i] = r_[i] + beta * d_[i];
     ++n_iter;
 
     if (sqrt(delta/delta0) < best_res)
     {
-      best_x = x;
+      best_x = x_blas;
       best_res = sqrt(delta/delta0);
     }
   }
@@ -0,0 +1,65 @@
+/**
+ * @date Thu Oct 15 10:12:31 2026 +0200
+ *
+ * @brief BLAS implementation of the Gram matrix accumulation used by the
+ * scatter matrix computations
+ *
+ * Copyright (C) Idiap Research Institute, Martigny, Switzerland
+ */
+
+#include <bob.math/stats.h>
+
+#include <bob.core/check.h>
+
+// Declaration of the external BLAS functions (symmetric rank-k update)
+extern "C" void dsyrk_( const char *uplo, const char *trans, const int *N,
+  const int *K, const double *alpha, const double *A, const int *lda,
+  const double *beta, double *C, const int *ldc);
+extern "C" void ssyrk_( const char *uplo, const char *trans, const int *N,
+  const int *K, const float *alpha, const float *A, const int *lda,
+  const float *beta, float *C, const int *ldc);
+
+/**
+ * The C-contiguous (D x n) matrix X is, for BLAS, the column-major (n x D)
+ * matrix X^T, hence S += X*X^T is computed with trans='T'. Only one triangle
+ * of S is updated by BLAS (the upper one of the column-major S, which is the
+ * lower one of the C-contiguous S), and it is mirrored afterwards.
+ */
+template <typename T, typename F>
+static void addGram_blas(F syrk, const blitz::Array<T,2>& X,
+    blitz::Array<T,2>& S)
+{
+  const int N = X.extent(0);
+  const int K = X.extent(1);
+  if (N == 0 || K == 0) return;
+
+  const char uplo = 'U';
+  const char trans = 'T';
+  const T one = 1;
+  const int ldx = K;
+  syrk(&uplo, &trans, &N, &K, &one, X.data(), &ldx, &one, S.data(), &N);
+
+  // mirrors the updated triangle
+  T* s = S.data();
+  for (int r=0; r<N; ++r)
+    for (int c=r+1; c<N; ++c)
+      s[r*N+c] = s[c*N+r];
+}
+
+void bob::math::detail::addGram(const blitz::Array<double,2>& X,
+    blitz::Array<double,2>& S)
+{
+  if (!bob::core::array::isCZeroBaseContiguous(S))
+    addGram<double>(X, S);
+  else
+    addGram_blas(dsyrk_, X, S);
+}
+
+void bob::math::detail::addGram(const blitz::Array<float,2>& X,
+    blitz::Array<float,2>& S)
+{
+  if (!bob::core::array::isCZeroBaseContiguous(S))
+    addGram<float>(X, S);
+  else
+    addGram_blas(ssyrk_, X, S);
+}
@@ -25,9 +25,40 @@ extern "C" void dgesvd_( const char *jobu, const char *jobvt, const int *M,
   const int* ldu, double *VT, const int *ldvt, double *work, const int *lwork,
   int *info);
 
+static int svd_lapack_work_size( const char jobz, const int M, const int N,
+  double *A, const int lda, double *S, double *U, const int ldu, double *VT,
+  const int ldvt, blitz::Array<int,1>& iwork, const bool safe)
+{
+  // Queries the optimal size of the working array of dgesvd (safe) or dgesdd
+  // (A, S, U and VT are not referenced by LAPACK during the query)
+  int info = 0;
+  const int lwork_query = -1;
+  double work_query;
+  if (safe) {
+    dgesvd_( &jobz, &jobz, &M, &N, A, &lda, S, U, &ldu,
+      VT, &ldvt, &work_query, &lwork_query, &info );
+    // Check info variable
+    if (info != 0)
+      throw std::runtime_error("The LAPACK dgesvd function returned a non-zero value.");
+  }
+  else {
+    // Integer (workspace) array, dimension (8*min(M,N))
+    const int l_iwork = 8*std::min(M,N);
+    if (iwork.extent(0) < l_iwork) iwork.resize(l_iwork);
+
+    dgesdd_( &jobz, &M, &N, A, &lda, S, U, &ldu,
+      VT, &ldvt, &work_query, &lwork_query, iwork.data(), &info );
+    // Check info variable
+    if (info != 0)
+      throw std::runtime_error("The LAPACK dgesdd function returned a non-zero value. You may consider using LAPACK dgsevd instead (see #171) by enabling the 'safe' option.");
+  }
+  return static_cast<int>(work_query);
+}
+
 static void svd_lapack( const char jobz, const int M, const int N,
   double *A, const int lda, double *S, double *U, const int ldu, double *VT,
-  const int ldvt, const bool safe)
+  const int ldvt, blitz::Array<double,1>& work, blitz::Array<int,1>& iwork,
+  const bool safe)
 {
   // Calls the LAPACK function:
   // We use dgesdd by default which is faster than its predecessor dgesvd,
@@ -36,22 +67,22 @@ static void svd_lapack( const char jobz, const int M, const int N,
   // However, dgesdd is failing on some matrices:
   //   see #171: http://github.com/idiap/bob/issues/171
   // Please note that matlab is relying on dgesvd.
+  //
+  // If the given work array is empty, the optimal size of the working array
+  // is queried and the array is resized accordingly. Otherwise, its extent is
+  // used as is, which avoids the query (and the allocation) when the same
+  // workspace is reused for several matrices of the same shape.
   int info = 0;
-  if (safe) {
-    // A/ Queries the optimal size of the working array
-    const int lwork_query = -1;
-    double work_query;
-    dgesvd_( &jobz, &jobz, &M, &N, A, &lda, S, U, &ldu,
-      VT, &ldvt, &work_query, &lwork_query, &info );
-    // Check info variable
-    if (info != 0)
-      throw std::runtime_error("The LAPACK dgesvd function returned a non-zero value.");
+  // A/ Queries the optimal size of the working array
+  if (work.extent(0) == 0)
+    work.resize(svd_lapack_work_size(jobz, M, N, A, lda, S, U, ldu, VT, ldvt,
+      iwork, safe));
 
+  if (safe) {
     // B/ Computes
-    const int lwork = static_cast<int>(work_query);
-    boost::shared_array<double> work(new double[lwork]);
+    const int lwork = work.extent(0);
     dgesvd_( &jobz, &jobz, &M, &N, A, &lda, S, U, &ldu,
-      VT, &ldvt, work.get(), &lwork, &info );
+      VT, &ldvt, work.data(), &lwork, &info );
     // Check info variable
     if (info != 0)
       throw std::runtime_error("The LAPACK dgesvd function returned a non-zero value.");
@@ -59,22 +90,12 @@ static void svd_lapack( const char jobz, const int M, const int N,
   else {
     // Integer (workspace) array, dimension (8*min(M,N))
     const int l_iwork = 8*std::min(M,N);
-    boost::shared_array<int> iwork(new int[l_iwork]);
-
-    // A/ Queries the optimal size of the working array
-    const int lwork_query = -1;
-    double work_query;
-    dgesdd_( &jobz, &M, &N, A, &lda, S, U, &ldu,
-      VT, &ldvt, &work_query, &lwork_query, iwork.get(), &info );
-    // Check info variable
-    if (info != 0)
-      throw std::runtime_error("The LAPACK dgesdd function returned a non-zero value. You may consider using LAPACK dgsevd instead (see #171) by enabling the 'safe' option.");
+    if (iwork.extent(0) < l_iwork) iwork.resize(l_iwork);
 
     // B/ Computes
-    const int lwork = static_cast<int>(work_query);
-    boost::shared_array<double> work(new double[lwork]);
+    const int lwork = work.extent(0);
     dgesdd_( &jobz, &M, &N, A, &lda, S, U, &ldu,
-      VT, &ldvt, work.get(), &lwork, iwork.get(), &info );
+      VT, &ldvt, work.data(), &lwork, iwork.data(), &info );
     // Check info variable
     if (info != 0)
       throw std::runtime_error("The LAPACK dgesdd function returned a non-zero value. You may consider using LAPACK dgsevd instead (see #171) by enabling the 'safe' option.");
@@ -82,7 +103,9 @@ static void svd_lapack( const char jobz, const int M, const int N,
   
   // Defining the sign of the eigenvectors
   // Approch extracted from page 8 - http://prod.sandia.gov/techlib/access-control.cgi/2007/076422.pdf  
-  if(U[0] < 0){    
+  // (there are no singular vectors to flip if only the singular values were
+  // computed)
+  if(jobz != 'N' && U[0] < 0){    
     int ucol=0; ucol= (jobz=='A')? M : std::min(M,N);
     for (int i=0; i<ldu*ucol; i++){
       U[i] = -1*U[i];
@@ -117,8 +140,42 @@ void bob::math::svd(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
   bob::math::svd_(A, U, sigma, Vt, safe);
 }
 
+void bob::math::svd(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
+  blitz::Array<double,1>& sigma, blitz::Array<double,2>& Vt,
+  blitz::Array<double,1>& work, bool safe)
+{
+  // Size variables
+  const int M = A.extent(0);
+  const int N = A.extent(1);
+  const int nb_singular = std::min(M,N);
+
+  // Checks zero base
+  bob::core::array::assertZeroBase(A);
+  bob::core::array::assertZeroBase(U);
+  bob::core::array::assertZeroBase(sigma);
+  bob::core::array::assertZeroBase(Vt);
+  // An empty workspace is queried and allocated by LAPACK (see svd_lapack)
+  if (work.extent(0) > 0) bob::core::array::assertCZeroBaseContiguous(work);
+  // Checks and resizes if required
+  bob::core::array::assertSameDimensionLength(U.extent(0), M);
+  bob::core::array::assertSameDimensionLength(U.extent(1), M);
+  bob::core::array::assertSameDimensionLength(sigma.extent(0), nb_singular);
+  bob::core::array::assertSameDimensionLength(Vt.extent(0), N);
+  bob::core::array::assertSameDimensionLength(Vt.extent(1), N);
+
+  bob::math::svd_(A, U, sigma, Vt, work, safe);
+}
+
 void bob::math::svd_(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
   blitz::Array<double,1>& sigma, blitz::Array<double,2>& Vt, bool safe)
+{
+  blitz::Array<double,1> work;
+  bob::math::svd_(A, U, sigma, Vt, work, safe);
+}
+
+void bob::math::svd_(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
+  blitz::Array<double,1>& sigma, blitz::Array<double,2>& Vt,
+  blitz::Array<double,1>& work, bool safe)
 {
   // Size variables
   const int M = A.extent(0);
@@ -160,8 +217,9 @@ void bob::math::svd_(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
   double *VT_lapack = VT_blitz_lapack.data();
 
   // Call the LAPACK function
+  blitz::Array<int,1> iwork;
   svd_lapack(jobz, N, M, A_lapack, lda, S_lapack, U_lapack, ldu,
-    VT_lapack, ldvt, safe);  
+    VT_lapack, ldvt, work, iwork, safe);
 
 
   // Copy singular vectors back to U, V and sigma if required
@@ -171,6 +229,50 @@ void bob::math::svd_(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
 }
 
 
+void bob::math::svd(const blitz::Array<double,3>& A, blitz::Array<double,3>& U,
+  blitz::Array<double,2>& sigma, blitz::Array<double,3>& Vt, bool safe)
+{
+  // Size variables
+  const int B = A.extent(0);
+  const int M = A.extent(1);
+  const int N = A.extent(2);
+  const int nb_singular = std::min(M,N);
+
+  // Checks zero base
+  bob::core::array::assertZeroBase(A);
+  bob::core::array::assertZeroBase(U);
+  bob::core::array::assertZeroBase(sigma);
+  bob::core::array::assertZeroBase(Vt);
+  // Checks and resizes if required
+  bob::core::array::assertSameDimensionLength(U.extent(0), B);
+  bob::core::array::assertSameDimensionLength(U.extent(1), M);
+  bob::core::array::assertSameDimensionLength(U.extent(2), M);
+  bob::core::array::assertSameDimensionLength(sigma.extent(0), B);
+  bob::core::array::assertSameDimensionLength(sigma.extent(1), nb_singular);
+  bob::core::array::assertSameDimensionLength(Vt.extent(0), B);
+  bob::core::array::assertSameDimensionLength(Vt.extent(1), N);
+  bob::core::array::assertSameDimensionLength(Vt.extent(2), N);
+
+  bob::math::svd_(A, U, sigma, Vt, safe);
+}
+
+void bob::math::svd_(const blitz::Array<double,3>& A, blitz::Array<double,3>& U,
+  blitz::Array<double,2>& sigma, blitz::Array<double,3>& Vt, bool safe)
+{
+  blitz::Range a = blitz::Range::all();
+
+  // All matrices share the same shape: the LAPACK workspace is queried and
+  // allocated with the first one, and then reused for all the others
+  blitz::Array<double,1> work;
+  for (int b=0; b<A.extent(0); ++b) {
+    blitz::Array<double,2> U_b = U(b,a,a);
+    blitz::Array<double,1> sigma_b = sigma(b,a);
+    blitz::Array<double,2> Vt_b = Vt(b,a,a);
+    bob::math::svd_(A(b,a,a), U_b, sigma_b, Vt_b, work, safe);
+  }
+}
+
+
 void bob::math::svd(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
   blitz::Array<double,1>& sigma, bool safe)
 {
@@ -227,8 +329,10 @@ void bob::math::svd_(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
   boost::shared_array<double> VT_lapack(new double[nb_singular*N]);
 
   // Call the LAPACK function
+  blitz::Array<double,1> work;
+  blitz::Array<int,1> iwork;
   svd_lapack(jobz, M, N, A_lapack, lda, S_lapack, U_lapack, ldu,
-    VT_lapack.get(), ldvt, safe);
+    VT_lapack.get(), ldvt, work, iwork, safe);
 
   // Copy singular vectors back to U, V and sigma if required
   if (!U_direct_use) Ut = U_blitz_lapack;
@@ -237,6 +341,13 @@ void bob::math::svd_(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
 
 
 void bob::math::svd(const blitz::Array<double,2>& A, blitz::Array<double,1>& sigma, bool safe)
+{
+  blitz::Array<double,1> work;
+  bob::math::svd(A, sigma, work, safe);
+}
+
+void bob::math::svd(const blitz::Array<double,2>& A, blitz::Array<double,1>& sigma,
+  blitz::Array<double,1>& work, bool safe)
 {
   // Size variables
   const int M = A.extent(0);
@@ -246,30 +357,40 @@ void bob::math::svd(const blitz::Array<double,2>& A, blitz::Array<double,1>& sig
   // Checks zero base
   bob::core::array::assertZeroBase(A);
   bob::core::array::assertZeroBase(sigma);
+  // An empty workspace is queried and allocated by LAPACK (see svd_lapack)
+  if (work.extent(0) > 0) bob::core::array::assertCZeroBaseContiguous(work);
   // Checks and resizes if required
   bob::core::array::assertSameDimensionLength(sigma.extent(0), nb_singular);
 
-  bob::math::svd_(A, sigma, safe);
+  bob::math::svd_(A, sigma, work, safe);
 }
 
 void bob::math::svd_(const blitz::Array<double,2>& A, blitz::Array<double,1>& sigma, bool safe)
+{
+  blitz::Array<double,1> work;
+  bob::math::svd_(A, sigma, work, safe);
+}
+
+void bob::math::svd_(const blitz::Array<double,2>& A, blitz::Array<double,1>& sigma,
+  blitz::Array<double,1>& work, bool safe)
 {
   // Size variables
   const int M = A.extent(0);
   const int N = A.extent(1);
   const int nb_singular = std::min(M,N);
 
-  // Prepares to call LAPACK function
+  // Prepares to call LAPACK function:
+  // A and A^T share the same singular values. We therefore decompose A^T,
+  // which does not require to transpose A when making the column-major copy.
 
   // Initialises LAPACK variables
-  const char jobz = 'N'; // Get first min(M,N) columns of U
-  const int lda = M;
-  const int ldu = M;
-  const int ldvt = std::min(M,N);
+  const char jobz = 'N'; // Only get the singular values
+  const int lda = N;
+  const int ldu = 1;
+  const int ldvt = 1;
 
   // Initialises LAPACK arrays
-  blitz::Array<double,2> A_blitz_lapack(
-    bob::core::array::ccopy(const_cast<blitz::Array<double,2>&>(A).transpose(1,0)));
+  blitz::Array<double,2> A_blitz_lapack(bob::core::array::ccopy(A));
   double* A_lapack = A_blitz_lapack.data();
   // Tries to use S directly to limit the number of copy()
   // S_lapack = S
@@ -282,9 +403,25 @@ void bob::math::svd_(const blitz::Array<double,2>& A, blitz::Array<double,1>& si
   double *VT_lapack = 0;
 
   // Call the LAPACK function
-  svd_lapack(jobz, M, N, A_lapack, lda, S_lapack, U_lapack, ldu,
-    VT_lapack, ldvt, safe);
+  blitz::Array<int,1> iwork;
+  svd_lapack(jobz, N, M, A_lapack, lda, S_lapack, U_lapack, ldu,
+    VT_lapack, ldvt, work, iwork, safe);
 
-  // Copy singular vectors back to U, V and sigma if required
+  // Copy singular values back to sigma if required
   if (!sigma_direct_use) sigma = S_blitz_lapack;
 }
+
+int bob::math::svd_work_size(const int M, const int N, const bool compute_uv,
+  const bool safe)
+{
+  // Mirrors the LAPACK calls of svd_(), which decompose A^T (size NxM). The
+  // matrices are not referenced by LAPACK during the workspace query.
+  double dummy = 0.;
+  blitz::Array<int,1> iwork;
+  if (compute_uv)
+    return svd_lapack_work_size('A', N, M, &dummy, std::max(1,N), &dummy,
+      &dummy, std::max(1,N), &dummy, std::max(1,M), iwork, safe);
+  else
+    return svd_lapack_work_size('N', N, M, &dummy, std::max(1,N), &dummy,
+      &dummy, 1, &dummy, 1, iwork, safe);
+}
@@ -15,20 +15,23 @@
 PyObject* py_gsvd (PyObject*, PyObject* args, PyObject* kwds) {
 
   /* Parses input arguments in a single shot */
-  static const char* const_kwlist[] = { "A", "B", 0 /* Sentinel */ };
+  static const char* const_kwlist[] = { "A", "B", "workspace", 0 /* Sentinel */ };
   static char** kwlist = const_cast<char**>(const_kwlist);
 
   PyBlitzArrayObject* A = 0;
   PyBlitzArrayObject* B = 0;
+  PyBlitzArrayObject* work = 0;
 
-  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O&O&", kwlist, 
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O&O&|O&", kwlist, 
                                    &PyBlitzArray_Converter, &A,
-                                   &PyBlitzArray_Converter, &B
+                                   &PyBlitzArray_Converter, &B,
+                                   &PyBlitzArray_OutputConverter, &work
       ))
       return 0;
 
    auto A_ = make_safe(A);
    auto B_ = make_safe(B);
+   auto work_ = make_xsafe(work);
 
   if (A->ndim != 2 || A->type_num != NPY_FLOAT64) {
     PyErr_Format(PyExc_TypeError, "`A` matrix only supports 2D 64-bit float array");
@@ -40,6 +43,11 @@ PyObject* py_gsvd (PyObject*, PyObject* args, PyObject* kwds) {
     return 0;
   }
 
+  if (work && (work->ndim != 1 || work->type_num != NPY_FLOAT64)) {
+    PyErr_Format(PyExc_TypeError, "`workspace` only supports 1D 64-bit float array");
+    return 0;
+  }
+
   auto A_bz = PyBlitzArrayCxx_AsBlitz<double,2>(A);
   auto B_bz = PyBlitzArrayCxx_AsBlitz<double,2>(B);
 
@@ -47,6 +55,18 @@ PyObject* py_gsvd (PyObject*, PyObject* args, PyObject* kwds) {
   const int N = A_bz->extent(1);
   const int P = B_bz->extent(0);
 
+  if (work) {
+    // Minimum LAPACK workspace size of dggsvd3, which hands all but N
+    // elements to dgeqp3 (3N+1) and to the unblocked QR/RQ routines (M, P).
+    // An empty workspace is rejected as well, since it would be resized in a
+    // temporary wrapper and not in the given array.
+    const int lwork = N + std::max(3*N + 1, std::max(M, P));
+    if (work->shape[0] < lwork) {
+      PyErr_Format(PyExc_ValueError, "`workspace` must have at least %d elements for a %dx%d matrix A and a %dx%d matrix B, but it has %" PY_FORMAT_SIZE_T "d", lwork, M, N, P, N, work->shape[0]);
+      return 0;
+    }
+  }
+
   // Creating the output matrices
   blitz::Array<double,2> U(M, M); U=0;
   blitz::Array<double,2> V(P, P); V=0;
@@ -58,7 +78,11 @@ PyObject* py_gsvd (PyObject*, PyObject* args, PyObject* kwds) {
   
 
   try {
-    bob::math::gsvd(*A_bz,*B_bz,U,V,zeroR,Q,X,C,S);
+    if (work) {
+      blitz::Array<int,1> iwork(N);
+      bob::math::gsvd(*A_bz,*B_bz,U,V,zeroR,Q,X,C,S, *PyBlitzArrayCxx_AsBlitz<double,1>(work), iwork);
+    }
+    else bob::math::gsvd(*A_bz,*B_bz,U,V,zeroR,Q,X,C,S);
     return Py_BuildValue("NNNNN",
                          PyBlitzArrayCxx_AsConstNumpy(U),
                          PyBlitzArrayCxx_AsConstNumpy(V),
@@ -82,28 +106,72 @@ PyObject* py_gsvd (PyObject*, PyObject* args, PyObject* kwds) {
 PyObject* py_svd (PyObject*, PyObject* args, PyObject* kwds) {
 
   /* Parses input arguments in a single shot */
-  static const char* const_kwlist[] = { "A",  0 /* Sentinel */ };
+  static const char* const_kwlist[] = { "A", "workspace", "compute_uv", 0 /* Sentinel */ };
   static char** kwlist = const_cast<char**>(const_kwlist);
 
   PyBlitzArrayObject* A = 0;
+  PyBlitzArrayObject* work = 0;
+  PyObject* compute_uv = Py_True;
 
-  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O&", kwlist, 
-                                   &PyBlitzArray_Converter, &A
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O&|O&O", kwlist, 
+                                   &PyBlitzArray_Converter, &A,
+                                   &PyBlitzArray_OutputConverter, &work,
+                                   &compute_uv
       ))
       return 0;
 
    auto A_ = make_safe(A);
+   auto work_ = make_xsafe(work);
 
   if (A->ndim != 2 || A->type_num != NPY_FLOAT64) {
     PyErr_Format(PyExc_TypeError, "`A` matrix only supports 2D 64-bit float array");
     return 0;
   }
 
+  if (work && (work->ndim != 1 || work->type_num != NPY_FLOAT64)) {
+    PyErr_Format(PyExc_TypeError, "`workspace` only supports 1D 64-bit float array");
+    return 0;
+  }
+
+
+  int uv = PyObject_IsTrue(compute_uv);
+  if (uv < 0) return 0;
 
   auto A_bz = PyBlitzArrayCxx_AsBlitz<double,2>(A);
 
   int M = A_bz->extent(0);
-  int N = A_bz->extent(1); 
+  int N = A_bz->extent(1);
+
+  if (work) {
+    // Minimum LAPACK workspace sizes: dgesvd for the full decomposition and
+    // dgesdd (JOBZ='N') for the singular values only. An empty workspace is
+    // rejected as well, since it would be resized in a temporary wrapper and
+    // not in the given array.
+    const int mn = std::min(M,N), mx = std::max(M,N);
+    const int lwork = std::max(1, uv ? std::max(3*mn + mx, 5*mn) : 3*mn + std::max(mx, 7*mn));
+    if (work->shape[0] < lwork) {
+      PyErr_Format(PyExc_ValueError, "`workspace` must have at least %d elements for a %dx%d matrix%s, but it has %" PY_FORMAT_SIZE_T "d", lwork, M, N, uv ? "" : " (compute_uv=False)", work->shape[0]);
+      return 0;
+    }
+  }
+
+  if (!uv) {
+    // Only computes the singular values (LAPACK dgesdd with JOBZ='N'), which
+    // skips the computation of the singular vectors
+    blitz::Array<double,1> S(std::min(M,N));
+    try {
+      if (work) bob::math::svd(*A_bz, S, *PyBlitzArrayCxx_AsBlitz<double,1>(work));
+      else bob::math::svd(*A_bz, S);
+      return PyBlitzArrayCxx_AsConstNumpy(S);
+    }
+    catch (std::exception& e) {
+      PyErr_SetString(PyExc_RuntimeError, e.what());
+    }
+    catch (...) {
+      PyErr_SetString(PyExc_RuntimeError, "svd failed: unknown exception caught");
+    }
+    return 0;
+  }
 
   // Creating the output matrices
   // Prepares to call LAPACK function:
@@ -117,7 +185,8 @@ PyObject* py_svd (PyObject*, PyObject* args, PyObject* kwds) {
   
 
   try {
-    bob::math::svd(*A_bz,V,S,U, true);
+    if (work) bob::math::svd(*A_bz,V,S,U, *PyBlitzArrayCxx_AsBlitz<double,1>(work), true);
+    else bob::math::svd(*A_bz,V,S,U, true);
 
     // S for the python output.
     // LAPACK returns an 1d matrix of size n.
@@ -147,3 +216,135 @@ PyObject* py_svd (PyObject*, PyObject* args, PyObject* kwds) {
 
 
 
+PyObject* py_svd_batch (PyObject*, PyObject* args, PyObject* kwds) {
+
+  /* Parses input arguments in a single shot */
+  static const char* const_kwlist[] = { "A", 0 /* Sentinel */ };
+  static char** kwlist = const_cast<char**>(const_kwlist);
+
+  PyBlitzArrayObject* A = 0;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O&", kwlist, 
+                                   &PyBlitzArray_Converter, &A
+      ))
+      return 0;
+
+   auto A_ = make_safe(A);
+
+  if (A->ndim != 3 || A->type_num != NPY_FLOAT64) {
+    PyErr_Format(PyExc_TypeError, "`A` matrix only supports 3D 64-bit float array");
+    return 0;
+  }
+
+  auto A_bz = PyBlitzArrayCxx_AsBlitz<double,3>(A);
+
+  int B = A_bz->extent(0);
+  int M = A_bz->extent(1);
+  int N = A_bz->extent(2); 
+
+  // Creating the output matrices, using the same conventions as for svd():
+  // If A = U.S.V^T, then A^T = V.S.U^T
+
+  blitz::Array<double,3> V(B, M, M); V=0;
+  blitz::Array<double,2> S(B, std::min(M,N)); S=0;  
+  blitz::Array<double,3> U(B, N, N); U=0;   
+  
+
+  try {
+    bob::math::svd(*A_bz,V,S,U, true);
+
+    // S for the python output, as a stack of MxN matrices with the singular
+    // values on their diagonals
+    blitz::Array<double,3> S_output(B, M, N); S_output=0;
+    for (int b=0; b<B; ++b)
+      for (int i=0; i<S.extent(1); ++i)
+        S_output(b,i,i) = S(b,i);
+    return Py_BuildValue("NNN",
+                         PyBlitzArrayCxx_AsConstNumpy(U),
+                         PyBlitzArrayCxx_AsConstNumpy(S_output),
+                         PyBlitzArrayCxx_AsConstNumpy(V));
+  }
+  catch (std::exception& e) {
+    PyErr_SetString(PyExc_RuntimeError, e.what());
+  }
+  catch (...) {
+    PyErr_SetString(PyExc_RuntimeError, "svd_batch failed: unknown exception caught");
+  }
+
+
+  return 0;
+
+}
+
+
+PyObject* py_svd_workspace_size (PyObject*, PyObject* args, PyObject* kwds) {
+
+  /* Parses input arguments in a single shot */
+  static const char* const_kwlist[] = { "shape", "compute_uv", 0 /* Sentinel */ };
+  static char** kwlist = const_cast<char**>(const_kwlist);
+
+  int M = 0, N = 0;
+  PyObject* compute_uv = Py_True;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "(ii)|O", kwlist, &M, &N, &compute_uv))
+      return 0;
+
+  if (M < 0 || N < 0) {
+    PyErr_Format(PyExc_ValueError, "`shape` must not be negative, but it is (%d, %d)", M, N);
+    return 0;
+  }
+
+  int uv = PyObject_IsTrue(compute_uv);
+  if (uv < 0) return 0;
+
+  try {
+    // svd() uses LAPACK dgesvd for the full decomposition and dgesdd
+    // otherwise
+    return Py_BuildValue("i", bob::math::svd_work_size(M, N, uv, uv));
+  }
+  catch (std::exception& e) {
+    PyErr_SetString(PyExc_RuntimeError, e.what());
+  }
+  catch (...) {
+    PyErr_SetString(PyExc_RuntimeError, "svd_workspace_size failed: unknown exception caught");
+  }
+
+  return 0;
+
+}
+
+
+PyObject* py_gsvd_workspace_size (PyObject*, PyObject* args, PyObject* kwds) {
+
+  /* Parses input arguments in a single shot */
+  static const char* const_kwlist[] = { "shape_A", "shape_B", 0 /* Sentinel */ };
+  static char** kwlist = const_cast<char**>(const_kwlist);
+
+  int M = 0, N = 0, P = 0, N_B = 0;
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "(ii)(ii)", kwlist, &M, &N, &P, &N_B))
+      return 0;
+
+  if (M < 0 || N < 0 || P < 0) {
+    PyErr_Format(PyExc_ValueError, "the shapes must not be negative, but they are (%d, %d) and (%d, %d)", M, N, P, N_B);
+    return 0;
+  }
+
+  if (N != N_B) {
+    PyErr_Format(PyExc_ValueError, "`A` and `B` must have the same number of columns, but they have %d and %d", N, N_B);
+    return 0;
+  }
+
+  try {
+    return Py_BuildValue("i", bob::math::gsvd_work_size(M, N, P));
+  }
+  catch (std::exception& e) {
+    PyErr_SetString(PyExc_RuntimeError, e.what());
+  }
+  catch (...) {
+    PyErr_SetString(PyExc_RuntimeError, "gsvd_workspace_size failed: unknown exception caught");
+  }
+
+  return 0;
+
+}
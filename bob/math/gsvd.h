@@ -9,3 +9,6 @@
 
 PyObject* py_gsvd(PyObject*, PyObject* args, PyObject* kwds);
 PyObject* py_svd(PyObject*, PyObject* args, PyObject* kwds);
+PyObject* py_svd_batch(PyObject*, PyObject* args, PyObject* kwds);
+PyObject* py_svd_workspace_size(PyObject*, PyObject* args, PyObject* kwds);
+PyObject* py_gsvd_workspace_size(PyObject*, PyObject* args, PyObject* kwds);
@@ -250,6 +250,8 @@ namespace bob { namespace math {
       mutable blitz::Array<double,2> m_cache_A_large;
       mutable blitz::Array<double,1> m_cache_b_large;
       mutable blitz::Array<double,1> m_cache_x_large;
+      mutable blitz::Array<double,2> m_cache_A_lapack;
+      mutable blitz::Array<int,1> m_cache_ipiv;
   };
 
   /**
@@ -53,6 +53,39 @@ void gsvd(blitz::Array<double,2>& A,
          blitz::Array<double,2>& C,
          blitz::Array<double,2>& S
          );
+
+/**
+ * @brief Same as above, but reuses the given LAPACK workspace.
+ *   If work is empty, the optimal workspace size is queried and work is
+ *   resized accordingly. Otherwise, its extent is passed as is to LAPACK,
+ *   which skips the workspace query. This is useful when decomposing several
+ *   pairs of matrices of the same shape.
+ *
+ * @param work The LAPACK workspace (C-contiguous)
+ * @param iwork The LAPACK integer workspace, resized to N if smaller. On
+ *   exit, it contains the sorting information returned by dggsvd3.
+ */
+void gsvd(blitz::Array<double,2>& A,
+         blitz::Array<double,2>& B,
+
+         blitz::Array<double,2>& U,
+         blitz::Array<double,2>& V,
+         blitz::Array<double,2>& zeroR,
+         blitz::Array<double,2>& Q,
+         blitz::Array<double,2>& X,
+         blitz::Array<double,2>& C,
+         blitz::Array<double,2>& S,
+         blitz::Array<double,1>& work,
+         blitz::Array<int,1>& iwork
+         );
+
+/**
+ * @brief Returns the optimal size of the LAPACK workspace to be given to the
+ *   gsvd() variant above, for A of size MxN and B of size PxN.
+ *   LAPACK requires less than that, but it then falls back to slower
+ *   unblocked code.
+ */
+int gsvd_work_size(const int M, const int N, const int P);
   /**
    * @brief Swaping using the LAPACK variable iWork
    *        http://www.netlib.org/lapack/explore-html/d1/d7e/group__double_g_esing_ga4a187519e5c71da3b3f67c85e9baf0f2.html#ga4a187519e5c71da3b3f67c85e9baf0f2
@@ -13,8 +13,14 @@
 
 #include <blitz/array.h>
 #include <numeric>
+#include <algorithm>
 #include <functional>
 #include <cmath>
+#include <stdint.h>
+
+#ifdef __AVX2__
+#include <immintrin.h>
+#endif
 
 #include <bob.core/assert.h>
 
@@ -27,9 +33,10 @@ namespace bob{ namespace math{
     }
 
   template <class T>
-    // helper function to compute the chi_square distance between the given values
+    // helper function to compute the chi_square distance between the given values;
+    // a zero sum implies a zero difference, so we divide by one instead of branching
     static inline T chi_square_distance(const T& v1, const T& v2){
-      return v1 != v2 ? (v1 - v2) * (v1 - v2) / (v1 + v2) : T(0);
+      return (v1 - v2) * (v1 - v2) / ((v1 + v2) + ((v1 + v2) == T(0)));
     }
 
   template <class T>
@@ -42,6 +49,31 @@ namespace bob{ namespace math{
       return (a1 - a2) * std::log(a1/a2);
     }
 
+  template <class T1>
+    // helper function to check whether the given sparse histogram indices cover a contiguous range of bins;
+    // this is an O(n) pre-scan, which the sparse measures pay on top of their (also linear) main loop
+    static inline bool contiguous_bins(const blitz::Array<T1,1>& index){
+      const int n = index.shape()[0];
+      for (int i = 1; i < n; ++i)
+        if (index(i) != index(0) + T1(i)) return false;
+      return true;
+    }
+
+  template <class T1>
+    // helper function to compute the offsets and the length of the overlapping part of two contiguous bin ranges
+    static inline int overlapping_bins(const blitz::Array<T1,1>& index_1, const blitz::Array<T1,1>& index_2, int& o1, int& o2){
+      const T1 lo = std::max(index_1(0), index_2(0));
+      const T1 hi = std::min(index_1(index_1.shape()[0]-1), index_2(index_2.shape()[0]-1));
+      if (hi < lo){
+        o1 = index_1.shape()[0];
+        o2 = index_2.shape()[0];
+        return 0;
+      }
+      o1 = static_cast<int>(lo - index_1(0));
+      o2 = static_cast<int>(lo - index_2(0));
+      return static_cast<int>(hi - lo) + 1;
+    }
+
 
   template <class T>
     //! Fast implementation of the histogram intersection measure
@@ -62,6 +94,38 @@ namespace bob{ namespace math{
           );
     }
 
+#ifdef __AVX2__
+  // helper function to sum up the eight 32 bit integers of the given AVX2 register
+  static inline int32_t horizontal_sum(const __m256i& v){
+    __m128i s = _mm_add_epi32(_mm256_castsi256_si128(v), _mm256_extracti128_si256(v, 1));
+    s = _mm_hadd_epi32(s, s);
+    s = _mm_hadd_epi32(s, s);
+    return _mm_cvtsi128_si32(s);
+  }
+
+  //! AVX2 implementation of the histogram intersection measure for 32 bit integral histograms
+  inline int32_t histogram_intersection(const blitz::Array<int32_t,1>& h1, const blitz::Array<int32_t,1>& h2){
+    bob::core::array::assertCContiguous(h1);
+    bob::core::array::assertCContiguous(h2);
+    bob::core::array::assertSameShape(h1,h2);
+    const int32_t* p1 = h1.data();
+    const int32_t* p2 = h2.data();
+    const int n = h1.extent(0);
+    // process eight bins at a time
+    __m256i acc = _mm256_setzero_si256();
+    int i = 0;
+    for (; i + 8 <= n; i += 8){
+      __m256i a = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(p1 + i));
+      __m256i b = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(p2 + i));
+      acc = _mm256_add_epi32(acc, _mm256_min_epi32(a, b));
+    }
+    int32_t sum = horizontal_sum(acc);
+    // roll up the remaining bins
+    for (; i < n; ++i) sum += bob::math::minimum(p1[i], p2[i]);
+    return sum;
+  }
+#endif
+
   template <class T1, class T2>
     //! Fast implementation of the sparse histogram intersection measure
     inline T2 histogram_intersection(
@@ -73,6 +137,14 @@ namespace bob{ namespace math{
       int i1 = 0, i2 = 0, i1_end = index_1.shape()[0], i2_end = index_2.shape()[0];
       T1 p1 = index_1(i1), p2 = index_2(i2);
       T2 sum = T2(0);
+      if (contiguous_bins(index_1) && contiguous_bins(index_2)){
+        // both histograms cover a contiguous range of bins,
+        // so the matching positions follow directly from the bin offsets
+        const int n = overlapping_bins(index_1, index_2, i1, i2);
+        for (int i = 0; i < n; ++i)
+          sum += bob::math::minimum(values_1(i1+i), values_2(i2+i));
+        return sum;
+      }
       while (i1 < i1_end && i2 < i2_end){
         p1 = index_1(i1);
         p2 = index_2(i2);
@@ -102,6 +174,108 @@ namespace bob{ namespace math{
           );
     }
 
+#ifdef __AVX2__
+  // helper function to compute the chi_square distances between eight pairs of 32 bit integers,
+  // summed up pairwise into four lanes; there is no integer division in AVX2,
+  // but the truncated double precision quotient is exact for 32 bit operands
+  static inline __m128i chi_square_distance(const __m256i& a, const __m256i& b){
+    __m256i d = _mm256_sub_epi32(a, b);
+    __m256i s = _mm256_add_epi32(a, b);
+    // empty bins in both histograms have a zero difference, so we can safely divide by one there
+    s = _mm256_sub_epi32(s, _mm256_cmpeq_epi32(s, _mm256_setzero_si256()));
+    d = _mm256_mullo_epi32(d, d);
+    __m128i q_lo = _mm256_cvttpd_epi32(_mm256_div_pd(
+        _mm256_cvtepi32_pd(_mm256_castsi256_si128(d)),
+        _mm256_cvtepi32_pd(_mm256_castsi256_si128(s))));
+    __m128i q_hi = _mm256_cvttpd_epi32(_mm256_div_pd(
+        _mm256_cvtepi32_pd(_mm256_extracti128_si256(d, 1)),
+        _mm256_cvtepi32_pd(_mm256_extracti128_si256(s, 1))));
+    return _mm_add_epi32(q_lo, q_hi);
+  }
+
+  //! AVX2 implementation of the chi square histogram distance measure for 32 bit integral histograms
+  inline int32_t chi_square(const blitz::Array<int32_t,1>& h1, const blitz::Array<int32_t,1>& h2){
+    bob::core::array::assertCContiguous(h1);
+    bob::core::array::assertCContiguous(h2);
+    bob::core::array::assertSameShape(h1,h2);
+    const int32_t* p1 = h1.data();
+    const int32_t* p2 = h2.data();
+    const int n = h1.extent(0);
+    // process eight bins at a time
+    __m128i acc = _mm_setzero_si128();
+    int i = 0;
+    for (; i + 8 <= n; i += 8){
+      __m256i a = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(p1 + i));
+      __m256i b = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(p2 + i));
+      acc = _mm_add_epi32(acc, bob::math::chi_square_distance(a, b));
+    }
+    acc = _mm_hadd_epi32(acc, acc);
+    acc = _mm_hadd_epi32(acc, acc);
+    int32_t sum = _mm_cvtsi128_si32(acc);
+    // roll up the remaining bins
+    for (; i < n; ++i) sum += bob::math::chi_square_distance(p1[i], p2[i]);
+    return sum;
+  }
+#endif
+
+  //! Fast implementation of the histogram intersection measure for 8 bit histograms;
+  //! the result is accumulated in 64 bit, so that it does not overflow
+  inline uint64_t histogram_intersection(const blitz::Array<uint8_t,1>& h1, const blitz::Array<uint8_t,1>& h2){
+    bob::core::array::assertCContiguous(h1);
+    bob::core::array::assertCContiguous(h2);
+    bob::core::array::assertSameShape(h1,h2);
+    const uint8_t* p1 = h1.data();
+    const uint8_t* p2 = h2.data();
+    const int n = h1.extent(0);
+    uint64_t sum = 0;
+    int i = 0;
+#ifdef __AVX2__
+    // process 32 bins at a time; the sum of absolute differences to zero
+    // reduces the minima into four 64 bit counters
+    const __m256i zero = _mm256_setzero_si256();
+    __m256i acc = zero;
+    for (; i + 32 <= n; i += 32){
+      __m256i a = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(p1 + i));
+      __m256i b = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(p2 + i));
+      acc = _mm256_add_epi64(acc, _mm256_sad_epu8(_mm256_min_epu8(a, b), zero));
+    }
+    uint64_t lanes[4];
+    _mm256_storeu_si256(reinterpret_cast<__m256i*>(lanes), acc);
+    sum = lanes[0] + lanes[1] + lanes[2] + lanes[3];
+#endif
+    // roll up the remaining bins
+    for (; i < n; ++i) sum += bob::math::minimum(p1[i], p2[i]);
+    return sum;
+  }
+
+  //! Fast implementation of the chi square histogram distance measure for 8 bit histograms;
+  //! the result is accumulated in 64 bit, so that it does not overflow
+  inline uint64_t chi_square(const blitz::Array<uint8_t,1>& h1, const blitz::Array<uint8_t,1>& h2){
+    bob::core::array::assertCContiguous(h1);
+    bob::core::array::assertCContiguous(h2);
+    bob::core::array::assertSameShape(h1,h2);
+    const uint8_t* p1 = h1.data();
+    const uint8_t* p2 = h2.data();
+    const int n = h1.extent(0);
+    uint64_t sum = 0;
+    int i = 0;
+#ifdef __AVX2__
+    // widen eight bins at a time to 32 bit and reuse the 32 bit kernel
+    __m256i acc = _mm256_setzero_si256();
+    for (; i + 8 <= n; i += 8){
+      __m256i a = _mm256_cvtepu8_epi32(_mm_loadl_epi64(reinterpret_cast<const __m128i*>(p1 + i)));
+      __m256i b = _mm256_cvtepu8_epi32(_mm_loadl_epi64(reinterpret_cast<const __m128i*>(p2 + i)));
+      acc = _mm256_add_epi64(acc, _mm256_cvtepi32_epi64(bob::math::chi_square_distance(a, b)));
+    }
+    uint64_t lanes[4];
+    _mm256_storeu_si256(reinterpret_cast<__m256i*>(lanes), acc);
+    sum = lanes[0] + lanes[1] + lanes[2] + lanes[3];
+#endif
+    // roll up the remaining bins
+    for (; i < n; ++i) sum += bob::math::chi_square_distance<int32_t>(p1[i], p2[i]);
+    return sum;
+  }
+
   template <class T1, class T2>
     //! Fast implementation of the sparse chi square measure
     inline T2 chi_square(
@@ -113,6 +287,20 @@ namespace bob{ namespace math{
       int i1 = 0, i2 = 0, i1_end = index_1.shape()[0], i2_end = index_2.shape()[0];
       T1 p1 = index_1(i1), p2 = index_2(i2);
       T2 sum = T2(0);
+      if (contiguous_bins(index_1) && contiguous_bins(index_2)){
+        // both histograms cover a contiguous range of bins,
+        // so the matching positions follow directly from the bin offsets
+        int o1, o2;
+        const int n = overlapping_bins(index_1, index_2, o1, o2);
+        while (i1 < o1) sum += bob::math::chi_square_distance(values_1(i1++), T2(0));
+        while (i2 < o2) sum += bob::math::chi_square_distance(T2(0), values_2(i2++));
+        for (int i = 0; i < n; ++i)
+          sum += bob::math::chi_square_distance(values_1(i1++), values_2(i2++));
+        // only one of the histograms can extend beyond the overlapping part
+        while (i1 < i1_end) sum += chi_square_distance(values_1(i1++), T2(0));
+        while (i2 < i2_end) sum += chi_square_distance(T2(0), values_2(i2++));
+        return sum;
+      }
       while (i1 < i1_end && i2 < i2_end){
         p1 = index_1(i1);
         p2 = index_2(i2);
@@ -28,6 +28,22 @@ namespace bob { namespace math {
   void linsolve_(const blitz::Array<double,2>& A,
       const blitz::Array<double,1>& b, blitz::Array<double,1>& x);
 
+  /**
+   * @brief Function which solves a linear system of equation using the
+   *   'generic' dgsev LAPACK function, reusing the given buffers.
+   * @param A The A squared-matrix of the system A*x=b (size NxN)
+   * @param b The b vector of the system A*x=b (size N)
+   * @param x The x vector of the system A*x=b which will be updated
+   *   at the end of the function.
+   * @param A_lapack Buffer for the LAPACK copy of A, resized to NxN if
+   *   required. Passing the same buffer again avoids any allocation when
+   *   solving several systems of the same size.
+   * @param ipiv Buffer for the pivot indices, resized to N if required.
+   */
+  void linsolve_(const blitz::Array<double,2>& A,
+      const blitz::Array<double,1>& b, blitz::Array<double,1>& x,
+      blitz::Array<double,2>& A_lapack, blitz::Array<int,1>& ipiv);
+
   /**
    * @brief Function which solves a linear system of equation using the
    *   'generic' dgsev LAPACK function.
@@ -13,11 +13,84 @@
 
 #include <blitz/array.h>
 #include <vector>
+#include <algorithm>
 
 #include <bob.core/assert.h>
 
 namespace bob { namespace math {
 
+  namespace detail {
+    /**
+     * @brief Accumulates the Gram matrix of the rows of X, i.e., S += X*X^T.
+     *
+     * X must be C-contiguous and zero-based. Each entry of S is evaluated
+     * once, as the dot product of two contiguous rows of X, instead of
+     * sweeping over the whole of S for every outer product. Only the upper
+     * triangle is computed, the lower one is mirrored.
+     */
+    template <typename T>
+      void addGram(const blitz::Array<T,2>& X, blitz::Array<T,2>& S)
+      {
+        const int n_rows = X.extent(0);
+        const int n_cols = X.extent(1);
+        for (int r1=0; r1<n_rows; ++r1) {
+          const T* x1 = X.data() + r1*n_cols;
+          for (int r2=r1; r2<n_rows; ++r2) {
+            const T* x2 = X.data() + r2*n_cols;
+            T acc = 0;
+            for (int c=0; c<n_cols; ++c) acc += x1[c] * x2[c];
+            S(r1,r2) += acc;
+            if (r2 != r1) S(r2,r1) += acc;
+          }
+        }
+      }
+
+    /**
+     * @brief Accumulates the Gram matrix of the rows of X, i.e., S += X*X^T,
+     * using the BLAS symmetric rank-k update (dsyrk).
+     *
+     * X must be C-contiguous and zero-based. If S is not C-contiguous and
+     * zero-based, the generic implementation above is used instead.
+     */
+    void addGram(const blitz::Array<double,2>& X, blitz::Array<double,2>& S);
+
+    /**
+     * @brief Accumulates the Gram matrix of the rows of X, i.e., S += X*X^T,
+     * using the BLAS symmetric rank-k update (ssyrk).
+     *
+     * X must be C-contiguous and zero-based. If S is not C-contiguous and
+     * zero-based, the generic implementation above is used instead.
+     */
+    void addGram(const blitz::Array<float,2>& X, blitz::Array<float,2>& S);
+
+    /**
+     * @brief Accumulates the scatter of the samples (rows) of A around the
+     * mean M, i.e., S += sum_n (A(n,:)-M)^T (A(n,:)-M).
+     *
+     * The samples are centered and transposed in blocks of at most
+     * block_size rows, so that the temporary buffer does not grow with the
+     * number of samples.
+     */
+    template <typename T>
+      void addScatter(const blitz::Array<T,2>& A, const blitz::Array<T,1>& M,
+          blitz::Array<T,2>& S, const int block_size=256)
+      {
+        blitz::firstIndex i;
+        blitz::secondIndex j;
+        blitz::Range a = blitz::Range::all();
+
+        // centered samples of a block, one feature per row
+        blitz::Array<T,2> buffer;
+        for (int start=0; start<A.extent(0); start+=block_size) {
+          const int n_rows = std::min(block_size, A.extent(0) - start);
+          if (buffer.extent(1) != n_rows) buffer.resize(A.extent(1), n_rows);
+          blitz::Array<T,2> block = A(blitz::Range(start, start+n_rows-1), a);
+          buffer = block(j,i) - M(i);
+          addGram(buffer, S);
+        }
+      }
+  }
+
   /**
    * @brief Computes the scatter matrix of a 2D array considering data is
    * organized row-wise (each sample is a row, each feature is a column).
@@ -34,16 +107,10 @@ namespace bob { namespace math {
         blitz::Array<T,1>& M) {
       blitz::firstIndex i;
       blitz::secondIndex j;
-      blitz::Range a = blitz::Range::all();
 
       M = blitz::mean(A(j,i),j);
       S = 0;
-
-      blitz::Array<T,1> buffer(A.extent(1));
-      for (int z=0; z<A.extent(0); ++z) {
-        buffer = A(z,a) - M;
-        S += buffer(i) * buffer(j); //outer product
-      }
+      detail::addScatter(A, M, S);
     }
 
   /**
@@ -186,10 +253,8 @@ namespace bob { namespace math {
       // within class scatter Sw
       Sw = 0;
       for (size_t k=0; k<data.size(); ++k) { //class loop
-        for (int example=0; example<data[k].extent(0); ++example) {
-          buffer = data[k](example,a) - m_k(a,k);
-          Sw += buffer(i) * buffer(j); //outer product
-        }
+        buffer = m_k(a,k);
+        detail::addScatter(data[k], buffer, Sw);
       }
     }
 
@@ -48,6 +48,75 @@ void svd(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
 void svd_(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
   blitz::Array<double,1>& sigma, blitz::Array<double,2>& Vt, bool safe=false);
 
+/**
+ * @brief Function which performs a 'full' Singular Value Decomposition
+ *   using the divide and conquer routine dgesdd of LAPACK, reusing the given
+ *   LAPACK workspace.
+ *   If work is empty, the optimal workspace size is queried and work is
+ *   resized accordingly. Otherwise, its extent is passed as is to LAPACK,
+ *   which skips the workspace query. This is useful when decomposing several
+ *   matrices of the same shape.
+ * @warning The output blitz::array U, sigma and Vt should have the correct 
+ *   size, with zero base index. Checks are performed.
+ * @param A The A matrix to decompose (size MxN)
+ * @param U The U matrix of left singular vectors (size MxM)
+ * @param sigma The vector of singular values (size min(M,N))
+ *    Please note that this is a 1D array rather than a 2D diagonal matrix!
+ * @param Vt The V^T matrix of right singular vectors (size NxN)
+ * @param work The LAPACK workspace (C-contiguous)
+ * @param safe If enabled, use LAPACK dgesvd instead of dgesdd
+ */
+void svd(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
+  blitz::Array<double,1>& sigma, blitz::Array<double,2>& Vt,
+  blitz::Array<double,1>& work, bool safe=false);
+/**
+ * @brief Function which performs a 'full' Singular Value Decomposition
+ *   using the divide and conquer routine dgesdd of LAPACK, reusing the given
+ *   LAPACK workspace (see above).
+ * @warning The output blitz::array U, sigma and Vt should have the correct 
+ *   size, with zero base index. Checks are NOT performed.
+ * @param A The A matrix to decompose (size MxN)
+ * @param U The U matrix of left singular vectors (size MxM)
+ * @param sigma The vector of singular values (size min(M,N))
+ *    Please note that this is a 1D array rather than a 2D diagonal matrix!
+ * @param Vt The V^T matrix of right singular vectors (size NxN)
+ * @param work The LAPACK workspace (C-contiguous)
+ * @param safe If enabled, use LAPACK dgesvd instead of dgesdd
+ */
+void svd_(const blitz::Array<double,2>& A, blitz::Array<double,2>& U,
+  blitz::Array<double,1>& sigma, blitz::Array<double,2>& Vt,
+  blitz::Array<double,1>& work, bool safe=false);
+
+
+/**
+ * @brief Function which performs a 'full' Singular Value Decomposition of
+ *   each of the B matrices of the stack A, using the divide and conquer
+ *   routine dgesdd of LAPACK. All matrices are decomposed with the same
+ *   LAPACK workspace, which is queried and allocated only once.
+ * @warning The output blitz::array U, sigma and Vt should have the correct 
+ *   size, with zero base index. Checks are performed.
+ * @param A The stack of matrices to decompose (size BxMxN)
+ * @param U The U matrices of left singular vectors (size BxMxM)
+ * @param sigma The singular values (size Bxmin(M,N))
+ * @param Vt The V^T matrices of right singular vectors (size BxNxN)
+ * @param safe If enabled, use LAPACK dgesvd instead of dgesdd
+ */
+void svd(const blitz::Array<double,3>& A, blitz::Array<double,3>& U,
+  blitz::Array<double,2>& sigma, blitz::Array<double,3>& Vt, bool safe=false);
+/**
+ * @brief Function which performs a 'full' Singular Value Decomposition of
+ *   each of the B matrices of the stack A, using the divide and conquer
+ *   routine dgesdd of LAPACK (see above).
+ * @warning The output blitz::array U, sigma and Vt should have the correct 
+ *   size, with zero base index. Checks are NOT performed.
+ * @param A The stack of matrices to decompose (size BxMxN)
+ * @param U The U matrices of left singular vectors (size BxMxM)
+ * @param sigma The singular values (size Bxmin(M,N))
+ * @param Vt The V^T matrices of right singular vectors (size BxNxN)
+ * @param safe If enabled, use LAPACK dgesvd instead of dgesdd
+ */
+void svd_(const blitz::Array<double,3>& A, blitz::Array<double,3>& U,
+  blitz::Array<double,2>& sigma, blitz::Array<double,3>& Vt, bool safe=false);
 
 /**
  * @brief Function which performs a 'partial' Singular Value Decomposition
@@ -108,6 +177,52 @@ void svd(const blitz::Array<double,2>& A, blitz::Array<double,1>& sigma,
 void svd_(const blitz::Array<double,2>& A, blitz::Array<double,1>& sigma,
   bool safe=false);
 
+/**
+ * @brief Function which performs a 'partial' Singular Value Decomposition
+ *   using LAPACK, only returning the singular values, and reusing the given
+ *   LAPACK workspace. If work is empty, the optimal workspace size is queried
+ *   and work is resized accordingly. Otherwise, its extent is passed as is
+ *   to LAPACK, which skips the workspace query.
+ * @warning The output blitz::array sigma should have the correct 
+ *   size, with zero base index. Checks are performed.
+ * @param A The A matrix to decompose (size MxN)
+ * @param sigma The vector of singular values (size min(M,N))
+ *    Please note that this is a 1D array rather than a 2D diagonal matrix!
+ * @param work The LAPACK workspace (C-contiguous)
+ * @param safe If enabled, use LAPACK dgesvd instead of dgesdd
+ */
+void svd(const blitz::Array<double,2>& A, blitz::Array<double,1>& sigma,
+  blitz::Array<double,1>& work, bool safe=false);
+/**
+ * @brief Function which performs a 'partial' Singular Value Decomposition
+ *   using LAPACK, only returning the singular values, and reusing the given
+ *   LAPACK workspace (see above).
+ * @warning The output blitz::array sigma should have the correct 
+ *   size, with zero base index. Checks are NOT performed.
+ * @param A The A matrix to decompose (size MxN)
+ * @param sigma The vector of singular values (size min(M,N))
+ *    Please note that this is a 1D array rather than a 2D diagonal matrix!
+ * @param work The LAPACK workspace (C-contiguous)
+ * @param safe If enabled, use LAPACK dgesvd instead of dgesdd
+ */
+void svd_(const blitz::Array<double,2>& A, blitz::Array<double,1>& sigma,
+  blitz::Array<double,1>& work, bool safe=false);
+
+/**
+ * @brief Returns the optimal size of the LAPACK workspace to be given to the
+ *   svd() variants above that take a workspace, for a matrix of size MxN.
+ *   LAPACK requires less than that, but it then falls back to slower
+ *   unblocked code.
+ * @param M The number of rows of the matrix to decompose
+ * @param N The number of columns of the matrix to decompose
+ * @param compute_uv If disabled, the size for the singular-values-only
+ *   variant is returned
+ * @param safe If enabled, the size for LAPACK dgesvd instead of dgesdd
+ *   is returned
+ */
+int svd_work_size(const int M, const int N, const bool compute_uv=true,
+  const bool safe=false);
+
 /**
  * @}
  */
@@ -19,6 +19,7 @@ bob::extension::FunctionDoc s_linsolve = bob::extension::FunctionDoc(
   "linsolve",
   "Solves the linear system :math:`Ax=b` and returns the result in :math:`x`.",
   "This method uses LAPACK's ``dgesv`` generic solver. "
+  "Both C- and Fortran-ordered (see :py:func:`numpy.asfortranarray`) :math:`A` matrices are handed over to LAPACK without transposing them. "
   "You can use this method in two different formats. "
   "The first interface accepts the matrices :math:`A` and :math:`b` returning :math:`x`. "
   "The second one accepts a pre-allocated :math:`x` vector and sets it with the linear system solution."
@@ -186,6 +187,7 @@ bob::extension::FunctionDoc s_linsolve_sympos = bob::extension::FunctionDoc(
   "linsolve_sympos",
   "Solves the linear system :math:`Ax=b` and returns the result in :math:`x` for symmetric :math:`A` matrix.",
   "This method uses LAPACK's ``dposv`` solver, assuming :math:`A` is a symmetric positive definite matrix. "
+  "Both C- and Fortran-ordered (see :py:func:`numpy.asfortranarray`) :math:`A` matrices are handed over to LAPACK without transposing them. "
   "You can use this method in two different formats. "
   "The first interface accepts the matrices :math:`A` and :math:`b` returning :math:`x`. "
   "The second one accepts a pre-allocated :math:`x` vector and sets it with the linear system solution."
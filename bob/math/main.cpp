@@ -184,7 +184,8 @@ static bob::extension::FunctionDoc s_scatters = bob::extension::FunctionDoc(
   "A normalization strategy mitigates this problem. "
   "The eigen vectors will see no effect on this normalization as they are normalized in the euclidean sense (:math:`||a|| = 1`) so that does not change those.\n\n"
   "This function supports many calling modes, but you should provide, at least, the input ``data``. "
-  "All non-provided arguments will be allocated internally and returned."
+  "All non-provided arguments will be allocated internally and returned. "
+  "When computing the scatters of many sets of classes with the same number of features, allocate ``sw``, ``sb`` and ``m`` once and pass them to every call, so that no new arrays are created."
   )
   .add_prototype("data", "sw, sb, m")
   .add_prototype("data, sw, sb", "m")
@@ -209,11 +210,13 @@ static bob::extension::FunctionDoc s_gsvd = bob::extension::FunctionDoc(
   "[U,V,X,C,S] = gsvd(A,B) returns unitary matrices :math:`U` and :math:`V`, the square matrix :math:`X` (which is :math:`[0 R] Q^{T}`), and nonnegative diagonal matrices :math:`C` and :math:`S` such that:\n\n"
   ".. math:: C^{T}C + S^{T}S = I \n"
   ".. math:: A = (XC^{T}U^{T})^{T}\n"
-  ".. math:: B = (XS^{T}V^{T})^{T}\n"
+  ".. math:: B = (XS^{T}V^{T})^{T}\n\n"
+  "When decomposing many pairs of matrices of the same shape, you can pre-allocate the LAPACK ``workspace`` once, with the size given by :py:func:`gsvd_workspace_size`, and pass it to every call."
   )
-  .add_prototype("A, B", "")
+  .add_prototype("A, B, [workspace]", "")
   .add_parameter("A", "[array_like (float, 2D)]", "Must be :math:`m \\times n`")
   .add_parameter("B", "[array_like (float, 2D)]", "Must be :math:`p \\times n`")
+  .add_parameter("workspace", "array_like (float, 1D)", "The LAPACK workspace; its size should be :py:func:`gsvd_workspace_size`, and must be at least :math:`n+\\max(3n+1, m, p)`, or a :py:class:`ValueError` is raised")
   .add_return("U", "[array_like (float, 2D)]", "Contains a :math:`m \\times m` orthogonal matrix.")
   .add_return("V", "[array_like (float, 2D)]", "Contains a :math:`n \\times n` orthogonal matrix.")
   .add_return("X", "[array_like (float, 2D)]", "Contains a :math:`p \\times q` matrix, where :math:`p=\\min(m+n,p)` and :math:`X=[0, R] Q^{T}` (Check LAPACK documentation).")
@@ -227,16 +230,63 @@ static bob::extension::FunctionDoc s_svd = bob::extension::FunctionDoc(
   "Computes the SVD",
   "Computes the SVD (Singular Value Decomposition).\n"
   "[U,S,V] = svd(A) returns :math:`U`, :math:`S` and :math:`V` such that ` \n\n"
-  ".. math:: A=U S V\n"
+  ".. math:: A=U S V\n\n"
+  "When decomposing many matrices of the same shape, you can pre-allocate the LAPACK ``workspace`` once, with the size given by :py:func:`svd_workspace_size`, and pass it to every call. "
+  "This avoids querying LAPACK for the optimal workspace size and allocating it at each call.\n\n"
+  "If you only need the singular values, set ``compute_uv`` to ``False``. "
+  "In this case, the singular vectors are not computed, which is considerably faster, and only the 1D array of singular values :math:`s` is returned."
   )
-  .add_prototype("A", "")
+  .add_prototype("A, [workspace], [compute_uv]", "U, S, V")
+  .add_prototype("A, [workspace], compute_uv", "s")
   .add_parameter("A", "[array_like (float, 2D)]", "Must be :math:`m \\times n`")
+  .add_parameter("workspace", "array_like (float, 1D)", "The LAPACK workspace; its size should be :py:func:`svd_workspace_size`, and must be at least :math:`\\max(3\\min(m,n)+\\max(m,n), 5\\min(m,n))` (``dgesvd``), or :math:`3\\min(m,n)+\\max(\\max(m,n), 7\\min(m,n))` (``dgesdd``) if ``compute_uv`` is ``False``; a :py:class:`ValueError` is raised if it is smaller")
+  .add_parameter("compute_uv", "bool", "[Default: ``True``] If ``False``, only the singular values are computed and returned")
   .add_return("U", "[array_like (float, 2D)]", "The :math:`U` matrix of left singular vectors (size :math:`m \\times m`)")
   .add_return("S", "[array_like (float, 2D)]", "The matrix of singular values :math:`S` of size :math:`m \\times n`")
   .add_return("V", "[array_like (float, 2D)]", "The :math:`V^{T}` matrix of right singular vectors (size :math:`n \\times n`)")
+  .add_return("s", "array_like (float, 1D)", "The singular values in descending order (size :math:`\\min(m,n)`), only returned if ``compute_uv`` is ``False``")
+;
+
+
+static bob::extension::FunctionDoc s_svd_workspace_size = bob::extension::FunctionDoc(
+  "svd_workspace_size",
+  "Returns the optimal LAPACK workspace size for :py:func:`svd`",
+  "Queries LAPACK for the optimal size of the ``workspace`` to be given to :py:func:`svd`, for matrices of the given shape. "
+  "A smaller workspace, down to the minimum documented in :py:func:`svd`, is accepted, but LAPACK then falls back to slower unblocked code."
+  )
+  .add_prototype("shape, [compute_uv]", "size")
+  .add_parameter("shape", "(int, int)", "The shape :math:`(m, n)` of the matrices to decompose")
+  .add_parameter("compute_uv", "bool", "[Default: ``True``] The ``compute_uv`` argument that will be given to :py:func:`svd`")
+  .add_return("size", "int", "The optimal number of elements of the workspace")
 ;
 
 
+static bob::extension::FunctionDoc s_gsvd_workspace_size = bob::extension::FunctionDoc(
+  "gsvd_workspace_size",
+  "Returns the optimal LAPACK workspace size for :py:func:`gsvd`",
+  "Queries LAPACK for the optimal size of the ``workspace`` to be given to :py:func:`gsvd`, for matrices of the given shapes. "
+  "A smaller workspace, down to the minimum documented in :py:func:`gsvd`, is accepted, but LAPACK then falls back to slower unblocked code."
+  )
+  .add_prototype("shape_A, shape_B", "size")
+  .add_parameter("shape_A", "(int, int)", "The shape :math:`(m, n)` of the ``A`` matrices")
+  .add_parameter("shape_B", "(int, int)", "The shape :math:`(p, n)` of the ``B`` matrices")
+  .add_return("size", "int", "The optimal number of elements of the workspace")
+;
+
+
+static bob::extension::FunctionDoc s_svd_batch = bob::extension::FunctionDoc(
+  "svd_batch",
+  "Computes the SVD of a stack of matrices",
+  "Computes the SVD (Singular Value Decomposition) of each of the :math:`b` matrices of ``A``, i.e., ``A[k]``, :math:`k=0..b-1`, following the same conventions as :py:func:`svd`. "
+  "All matrices are decomposed by a single call, reusing the same LAPACK workspace, which is much faster than calling :py:func:`svd` in a loop over many small matrices."
+  )
+  .add_prototype("A", "U, S, V")
+  .add_parameter("A", "array_like (float, 3D)", "The stack of matrices, must be :math:`b \\times m \\times n`")
+  .add_return("U", "array_like (float, 3D)", "The :math:`U` matrices of left singular vectors (size :math:`b \\times n \\times n`)")
+  .add_return("S", "array_like (float, 3D)", "The matrices of singular values :math:`S` (size :math:`b \\times m \\times n`)")
+  .add_return("V", "array_like (float, 3D)", "The :math:`V^{T}` matrices of right singular vectors (size :math:`b \\times m \\times m`)")
+;
+
 
 static PyMethodDef module_methods[] = {
     {
@@ -329,6 +379,24 @@ static PyMethodDef module_methods[] = {
       METH_VARARGS|METH_KEYWORDS,
       s_svd.doc()
     },
+    {
+      s_svd_batch.name(),
+      (PyCFunction)py_svd_batch,
+      METH_VARARGS|METH_KEYWORDS,
+      s_svd_batch.doc()
+    },
+    {
+      s_svd_workspace_size.name(),
+      (PyCFunction)py_svd_workspace_size,
+      METH_VARARGS|METH_KEYWORDS,
+      s_svd_workspace_size.doc()
+    },
+    {
+      s_gsvd_workspace_size.name(),
+      (PyCFunction)py_gsvd_workspace_size,
+      METH_VARARGS|METH_KEYWORDS,
+      s_gsvd_workspace_size.doc()
+    },
 
     {0}  /* Sentinel */
 };
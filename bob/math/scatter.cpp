@@ -242,30 +242,32 @@ PyObject* py_scatters (PyObject*, PyObject* args, PyObject* kwds) {
       case NPY_FLOAT32:
         {
           std::vector<blitz::Array<float,2>> cxxdata;
+          cxxdata.reserve(PyTuple_GET_SIZE(data));
           for (Py_ssize_t i=0; i<PyTuple_GET_SIZE(data); ++i) {
             cxxdata.push_back(*PyBlitzArrayCxx_AsBlitz<float,2>
                 ((PyBlitzArrayObject*)PyTuple_GET_ITEM(data,i)));
-            bob::math::scatters(cxxdata,
-                *PyBlitzArrayCxx_AsBlitz<float,2>(sw),
-                *PyBlitzArrayCxx_AsBlitz<float,2>(sb),
-                *PyBlitzArrayCxx_AsBlitz<float,1>(m)
-                );
           }
+          bob::math::scatters(cxxdata,
+              *PyBlitzArrayCxx_AsBlitz<float,2>(sw),
+              *PyBlitzArrayCxx_AsBlitz<float,2>(sb),
+              *PyBlitzArrayCxx_AsBlitz<float,1>(m)
+              );
         }
         break;
 
       case NPY_FLOAT64:
         {
           std::vector<blitz::Array<double,2>> cxxdata;
+          cxxdata.reserve(PyTuple_GET_SIZE(data));
           for (Py_ssize_t i=0; i<PyTuple_GET_SIZE(data); ++i) {
             cxxdata.push_back(*PyBlitzArrayCxx_AsBlitz<double,2>
                 ((PyBlitzArrayObject*)PyTuple_GET_ITEM(data,i)));
-            bob::math::scatters(cxxdata,
-                *PyBlitzArrayCxx_AsBlitz<double,2>(sw),
-                *PyBlitzArrayCxx_AsBlitz<double,2>(sb),
-                *PyBlitzArrayCxx_AsBlitz<double,1>(m)
-                );
           }
+          bob::math::scatters(cxxdata,
+              *PyBlitzArrayCxx_AsBlitz<double,2>(sw),
+              *PyBlitzArrayCxx_AsBlitz<double,2>(sb),
+              *PyBlitzArrayCxx_AsBlitz<double,1>(m)
+              );
         }
         break;
 
@@ -22,28 +22,39 @@ import nose.tools
 numpy.random.seed(10)
 
 
-def gsvd_relations(A,B):
-  [U,V,X,C,S] = bob.math.gsvd(A, B)
+def gsvd_relations(A, B, workspace=None):
+  if workspace is None:
+    [U,V,X,C,S] = bob.math.gsvd(A, B)
+  else:
+    [U,V,X,C,S] = bob.math.gsvd(A, B, workspace)
 
   # Cheking the relation  C**2 + S**2 = 1
   I = numpy.eye(A.shape[1])
   I_check = numpy.dot(C.T, C) + numpy.dot(S.T, S)
-  nose.tools.eq_( (abs(I-I_check) < 1e-10).all(), True )
+  nose.tools.eq_( numpy.allclose(I, I_check, atol=1e-10, rtol=0), True )
 
   # Cheking the relation A= (X * C.T * U^T)^T
-  A_check = numpy.dot(numpy.dot(X,C.T),U.T).T
-  nose.tools.eq_( (abs(A-A_check) < 1e-10).all(), True )
+  A_check = numpy.linalg.multi_dot([X, C.T, U.T]).T
+  nose.tools.eq_( numpy.allclose(A, A_check, atol=1e-10, rtol=0), True )
 
   # Cheking the relation B= (X * S.T * V^T)^T 
-  B_check = numpy.dot(numpy.dot(X,S.T),V.T).T
-  nose.tools.eq_( (abs(B-B_check) < 1e-10).all(), True )
+  B_check = numpy.linalg.multi_dot([X, S.T, V.T]).T
+  nose.tools.eq_( numpy.allclose(B, B_check, atol=1e-10, rtol=0), True )
 
 
-def svd_relations(A):
+def svd_relations(A, workspace=None):
 
-  [U, S, V] = bob.math.svd(A)  
+  if workspace is None:
+    [U, S, V] = bob.math.svd(A)
+  else:
+    [U, S, V] = bob.math.svd(A, workspace)
   A_check = numpy.dot(numpy.dot(V,S), U)
-  nose.tools.eq_( (abs(A-A_check) < 1e-10).all(), True )
+  nose.tools.eq_( numpy.allclose(A, A_check, atol=1e-10, rtol=0), True )
+
+  # Cheking the singular values only variant
+  s = bob.math.svd(A, compute_uv=False)
+  nose.tools.eq_(s.shape, (min(A.shape),))
+  nose.tools.eq_( numpy.allclose(s, numpy.diag(S), atol=1e-10, rtol=0), True )
 
 
 def test_first_case():
@@ -79,6 +90,26 @@ def test_corner_case():
   gsvd_relations(A, B)
 
 
+def test_gsvd_workspace():
+
+  ##Testing GSVD, reusing the same LAPACK workspace for same-shaped matrices
+  m, n, p = 10, 10, 790
+  size = bob.math.gsvd_workspace_size((m, n), (p, n))
+  nose.tools.assert_true(size >= n + max(3*n+1, m, p))
+  workspace = numpy.empty((size,), numpy.float64)
+  for k in range(3):
+    A = numpy.random.rand(m, n)
+    B = numpy.random.rand(p, n)
+    gsvd_relations(A, B, workspace)
+
+  ##A workspace of the minimum size is accepted, a smaller one is rejected
+  minimum = numpy.empty((n + max(3*n+1, m, p),), numpy.float64)
+  gsvd_relations(A, B, minimum)
+  nose.tools.assert_raises(ValueError, bob.math.gsvd, A, B, minimum[:-1])
+  nose.tools.assert_raises(ValueError, bob.math.gsvd, A, B, numpy.empty((0,), numpy.float64))
+  nose.tools.assert_raises(ValueError, bob.math.gsvd_workspace_size, (m, n), (p, n+1))
+
+
 
 def test_svd_relation():
 
@@ -93,6 +124,46 @@ def test_svd_relation():
   A = numpy.random.rand(30, 25)
   svd_relations(A)
 
+  ##Testing SVD, reusing the same LAPACK workspace for same-shaped matrices
+  m, n = 30, 25
+  minimum = max(3*min(m,n)+max(m,n), 5*min(m,n))
+  size = bob.math.svd_workspace_size((m, n))
+  nose.tools.assert_true(size >= minimum)
+  workspace = numpy.empty((size,), numpy.float64)
+  for k in range(3):
+    A = numpy.random.rand(m, n)
+    svd_relations(A, workspace)
+
+  ##The same, when only computing the singular values
+  size = bob.math.svd_workspace_size((m, n), compute_uv=False)
+  nose.tools.assert_true(size >= 3*min(m,n) + max(max(m,n), 7*min(m,n)))
+  workspace_s = numpy.empty((size,), numpy.float64)
+  s = bob.math.svd(A, workspace_s, False)
+  nose.tools.eq_( numpy.allclose(s, bob.math.svd(A, compute_uv=False), atol=1e-10, rtol=0), True )
+
+  ##A workspace of the minimum size is accepted, a smaller (or empty) one is rejected
+  svd_relations(A, workspace[:minimum])
+  nose.tools.assert_raises(ValueError, bob.math.svd, A, workspace[:minimum-1])
+  nose.tools.assert_raises(ValueError, bob.math.svd, A, numpy.empty((0,), numpy.float64))
+  nose.tools.assert_raises(ValueError, bob.math.svd, A, workspace[:minimum], False)
+
+
+
+def test_svd_batch():
+
+  ##Testing SVD on a stack of matrices
+  A = numpy.random.rand(5, 30, 25)
+  [U, S, V] = bob.math.svd_batch(A)
+
+  nose.tools.eq_(U.shape, (5, 25, 25))
+  nose.tools.eq_(S.shape, (5, 30, 25))
+  nose.tools.eq_(V.shape, (5, 30, 30))
+  for k in range(A.shape[0]):
+    [U_k, S_k, V_k] = bob.math.svd(A[k])
+    nose.tools.eq_( numpy.allclose(U[k], U_k, atol=1e-10, rtol=0), True )
+    nose.tools.eq_( numpy.allclose(S[k], S_k, atol=1e-10, rtol=0), True )
+    nose.tools.eq_( numpy.allclose(V[k], V_k, atol=1e-10, rtol=0), True )
+
 
 
 def test_svd_signal():
@@ -107,7 +178,7 @@ def test_svd_signal():
                        [ 7.04651683e-01,  7.09553332e-01,  2.73037723e-04]])
   
   [U,S,V] = bob.math.svd(A)
-  nose.tools.eq_((abs(U-U_ref) < 1e-8).all(), True)
+  nose.tools.eq_( numpy.allclose(U, U_ref, atol=1e-8, rtol=0), True )
   svd_relations(A)
   
 
@@ -8,42 +8,48 @@
 """Tests bob interior point Linear Programming solvers
 """
 
-import os, sys
 from bob.math import histogram_intersection, kullback_leibler, chi_square
 import numpy
 import nose.tools
 
+try:
+  # compiles the reference implementations, when numba is available
+  from numba import njit
+except ImportError:
+  njit = lambda **kwargs: (lambda f: f)
+
+@njit(cache=True)
 def py_chi_square(h1, h2):
   """Computes the chi-square distance between two histograms (or histogram
   sequences)"""
 
-  d = 0
-  for i in range(h1.shape[0]):
-    if h1[i] != h2[i]: d += int(((h1[i] - h2[i])**2) / (h1[i] + h2[i]))
-  return d
+  diff = h1.astype(numpy.int64) - h2
+  s = h1.astype(numpy.int64) + h2
+  mask = s != 0
+  return int((diff[mask]**2 // s[mask]).sum())
 
+@njit(cache=True)
 def py_histogram_intersection(h1, h2):
   """Computes the intersection measure of the given histograms (or histogram
   sequences)"""
 
-  dist = 0
-  for i in range(h1.shape[0]):
-    dist += min(h1[i], h2[i])
-  return dist
+  return int(numpy.minimum(h1, h2).sum())
 
 
 # initialize histograms to test the two measures
 m_h1 = numpy.array([0,15,3,7,4,0,3,0,17,12], dtype = numpy.int32)
 m_h2 = numpy.array([2,7,14,3,25,0,7,1,0,4], dtype = numpy.int32)
 
-m_h3 = numpy.random.random_integers(0,99,size=(100000,))
-m_h4 = numpy.random.random_integers(0,99,size=(100000,))
+rng = numpy.random.default_rng(0)
+m_h3, m_h4 = rng.integers(0, 100, size=(2,100000), dtype=numpy.int32)
 
 m_h5 = numpy.array([1,0,0,1,0,0,1,0,1,1], dtype = numpy.float64)
 m_h6 = numpy.array([1,0,1,0,0,0,1,0,1,1], dtype = numpy.float64)
 
 index_1 = numpy.array([0,3,6,8,9], dtype = numpy.uint16)
 index_2 = numpy.array([0,2,6,8,9], dtype = numpy.uint16)
+index_3 = numpy.array([2,3,4,5,6], dtype = numpy.uint16)
+index_4 = numpy.array([4,5,6,7,8], dtype = numpy.uint16)
 values = numpy.array([1,1,1,1,1], dtype = numpy.float64)
 
 def test_histogram_intersection():
@@ -51,6 +57,10 @@ def test_histogram_intersection():
   # compare our implementation with bob.math
   nose.tools.eq_(histogram_intersection(m_h1, m_h2), py_histogram_intersection(m_h1, m_h2))
   nose.tools.eq_(histogram_intersection(m_h3, m_h4), py_histogram_intersection(m_h3, m_h4))
+  nose.tools.eq_(histogram_intersection(m_h3.astype(numpy.uint8), m_h4.astype(numpy.uint8)), py_histogram_intersection(m_h3, m_h4))
+  # lengths that are not a multiple of the 32 bins of an AVX2 register
+  nose.tools.eq_(histogram_intersection(m_h1.astype(numpy.uint8), m_h2.astype(numpy.uint8)), py_histogram_intersection(m_h1, m_h2))
+  nose.tools.eq_(histogram_intersection(m_h3[:77].astype(numpy.uint8), m_h4[:77].astype(numpy.uint8)), py_histogram_intersection(m_h3[:77], m_h4[:77]))
 
   # test specific (simple) case
   nose.tools.eq_(histogram_intersection(m_h5, m_h5), 5.)
@@ -58,12 +68,18 @@ def test_histogram_intersection():
 
   nose.tools.eq_(histogram_intersection(index_1, values, index_1, values), 5.)
   nose.tools.eq_(histogram_intersection(index_1, values, index_2, values), 4.)
+  nose.tools.eq_(histogram_intersection(index_3, values, index_4, values), 3.)
+  nose.tools.eq_(histogram_intersection(index_4, values, index_3, values), 3.)
 
 def test_chi_square():
 
   # compare our implementation with bob.math
   nose.tools.eq_(chi_square(m_h1, m_h2), py_chi_square(m_h1, m_h2))
   nose.tools.eq_(chi_square(m_h3, m_h4), py_chi_square(m_h3, m_h4))
+  nose.tools.eq_(chi_square(m_h3.astype(numpy.uint8), m_h4.astype(numpy.uint8)), py_chi_square(m_h3, m_h4))
+  # lengths that are not a multiple of the 32 bins of an AVX2 register
+  nose.tools.eq_(chi_square(m_h1.astype(numpy.uint8), m_h2.astype(numpy.uint8)), py_chi_square(m_h1, m_h2))
+  nose.tools.eq_(chi_square(m_h3[:77].astype(numpy.uint8), m_h4[:77].astype(numpy.uint8)), py_chi_square(m_h3[:77], m_h4[:77]))
 
   # test specific (simple) case
   nose.tools.eq_(chi_square(m_h5, m_h5), 0.)
@@ -71,6 +87,8 @@ def test_chi_square():
 
   nose.tools.eq_(chi_square(index_1, values, index_1, values), 0.)
   nose.tools.eq_(chi_square(index_1, values, index_2, values), 2.)
+  nose.tools.eq_(chi_square(index_3, values, index_4, values), 4.)
+  nose.tools.eq_(chi_square(index_4, values, index_3, values), 4.)
 
 def test_kullback_leibler():
 
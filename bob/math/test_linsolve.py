@@ -8,7 +8,6 @@
 """Tests bob linear solvers A*x=b.
 """
 
-import os, sys
 from bob.math import linsolve, linsolve_sympos, linsolve_cg_sympos
 import numpy
 import nose.tools
@@ -27,15 +26,17 @@ def test_linsolve():
   x_ref = numpy.array([3., -2., 1.], 'float64')
 
   # Matrix for storing the result
-  x1 = numpy.ndarray((3,), 'float64')
+  x1 = numpy.empty((3,), 'float64')
 
   # Computes the solution
   linsolve(A,b,x1)
   x2 = linsolve(A,b)
+  x3 = linsolve(numpy.asfortranarray(A),b)
 
   # Compare to reference
-  nose.tools.eq_( (abs(x1-x_ref) < 1e-10).all(), True )
-  nose.tools.eq_( (abs(x2-x_ref) < 1e-10).all(), True )
+  nose.tools.eq_( numpy.allclose(x1, x_ref, atol=1e-10, rtol=0), True )
+  nose.tools.eq_( numpy.allclose(x2, x_ref, atol=1e-10, rtol=0), True )
+  nose.tools.eq_( numpy.allclose(x3, x_ref, atol=1e-10, rtol=0), True )
 
 def test_linsolveSympos():
 
@@ -51,15 +52,17 @@ def test_linsolveSympos():
   x_ref = numpy.array([8.5, 10., 6.5], 'float64')
 
   # Matrix for storing the result
-  x1 = numpy.ndarray((3,), 'float64')
+  x1 = numpy.empty((3,), 'float64')
 
   # Computes the solution
   linsolve_sympos(A,b,x1)
   x2 = linsolve_sympos(A,b)
+  x3 = linsolve_sympos(numpy.asfortranarray(A),b)
 
   # Compare to reference
-  nose.tools.eq_( (abs(x1-x_ref) < 1e-10).all(), True )
-  nose.tools.eq_( (abs(x2-x_ref) < 1e-10).all(), True )
+  nose.tools.eq_( numpy.allclose(x1, x_ref, atol=1e-10, rtol=0), True )
+  nose.tools.eq_( numpy.allclose(x2, x_ref, atol=1e-10, rtol=0), True )
+  nose.tools.eq_( numpy.allclose(x3, x_ref, atol=1e-10, rtol=0), True )
 
 def test_linsolveCGSympos():
 
@@ -76,7 +79,7 @@ def test_linsolveCGSympos():
   x_ref = numpy.array([8.5, 10., 6.5], 'float64')
 
   # Matrix for storing the result
-  x1 = numpy.ndarray((3,), 'float64')
+  x1 = numpy.empty((3,), 'float64')
 
   # Computes the solution
   eps = 1e-6
@@ -85,5 +88,5 @@ def test_linsolveCGSympos():
   x2 = linsolve_cg_sympos(A,b,eps,max_iter)
 
   # Compare to reference
-  nose.tools.eq_( (abs(x1-x_ref) < 2e-6).all(), True )
-  nose.tools.eq_( (abs(x2-x_ref) < 2e-6).all(), True )
+  nose.tools.eq_( numpy.allclose(x1, x_ref, atol=2e-6, rtol=0), True )
+  nose.tools.eq_( numpy.allclose(x2, x_ref, atol=2e-6, rtol=0), True )
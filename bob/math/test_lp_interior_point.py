@@ -8,34 +8,28 @@
 """Tests bob interior point Linear Programming solvers
 """
 
-import os, sys
 from bob.math import LPInteriorPointShortstep, LPInteriorPointPredictorCorrector, LPInteriorPointLongstep
 import numpy
 import nose.tools
 
 def generateProblem(n):
-  A = numpy.ndarray((n,2*n), numpy.float64)
-  b = numpy.ndarray((n,), numpy.float64)
-  c = numpy.ndarray((2*n,), numpy.float64)
-  x0 = numpy.ndarray((2*n,), numpy.float64)
-  sol = numpy.ndarray((n,), numpy.float64)
-  A[:] = 0.
-  c[:] = 0.
-  sol[:] = 0.
-  for i in range(n):
-    A[i,i] = 1.
-    A[i,n+i] = 1.
-    for j in range(i+1,n):
-      A[j,i] = pow(2., 1+j)
-    b[i] = pow(5.,i+1)
-    c[i] = -pow(2., n-1-i)
-    x0[i] = 1.
-  ones = numpy.ndarray((n,), numpy.float64)
-  ones[:] = 1.
-  A1_1 = numpy.dot(A[:,0:n], ones)
-  for i in range(n):
-    x0[n+i] = b[i] - A1_1[i]
-  sol[n-1] = pow(5.,n)
+  r = numpy.arange(n)
+  # powers of two and five, without going through pow()
+  pow2 = numpy.left_shift(1, numpy.arange(n+1)).astype(numpy.float64)
+  pow5 = numpy.cumprod(numpy.full((n,), 5.))
+  A = numpy.zeros((n,2*n), numpy.float64)
+  A[r,r] = 1.
+  A[r,n+r] = 1.
+  i, j = numpy.tril_indices(n, -1)
+  A[i,j] = pow2[1+i]
+  b = pow5
+  c = numpy.zeros((2*n,), numpy.float64)
+  c[:n] = -pow2[n-1::-1]
+  x0 = numpy.zeros((2*n,), numpy.float64)
+  x0[:n] = 1.
+  x0[n:] = b - A[:,:n].sum(axis=1)
+  sol = numpy.zeros((n,), numpy.float64)
+  sol[n-1] = pow5[n-1]
   return (A,b,c,x0,sol)
 
 def test_solvers():
@@ -52,19 +46,19 @@ def test_solvers():
     op1 = LPInteriorPointShortstep(A.shape[0], A.shape[1], 0.4, acc)
     x = op1.solve(A, b, c, x0)
     # Compare to reference solution
-    nose.tools.eq_( (abs(x-sol) < eps).all(), True )
+    nose.tools.eq_( numpy.allclose(x, sol, atol=eps, rtol=0), True )
 
     # predictor corrector
     op2 = LPInteriorPointPredictorCorrector(A.shape[0], A.shape[1], 0.5, 0.25, acc)
     x = op2.solve(A, b, c, x0)
     # Compare to reference solution
-    nose.tools.eq_( (abs(x-sol) < eps).all(), True )
+    nose.tools.eq_( numpy.allclose(x, sol, atol=eps, rtol=0), True )
 
     # long step
     op3 = LPInteriorPointLongstep(A.shape[0], A.shape[1], 1e-3, 0.1, acc)
     x = op3.solve(A, b, c, x0)
     # Compare to reference solution
-    nose.tools.eq_( (abs(x-sol) < eps).all(), True )
+    nose.tools.eq_( numpy.allclose(x, sol, atol=eps, rtol=0), True )
 
 def test_parameters():
 
@@ -149,4 +143,4 @@ def test_dual():
   eps = 1e-4
   At = A.transpose(1,0)
   ref = numpy.dot(At, lambda_) + mu
-  assert numpy.all(numpy.fabs(ref - c <= eps))
+  assert numpy.allclose(ref, c, atol=eps, rtol=0)
@@ -8,7 +8,6 @@
 """Tests for statistical methods
 """
 
-import os, sys
 from bob.math import norminv, normsinv
 import numpy
 
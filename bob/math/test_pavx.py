@@ -8,7 +8,6 @@
 """Tests for the PAVA-like algorithm
 """
 
-import os, sys
 from bob.math import pavx, pavxWidth, pavxWidthHeight
 import numpy
 
@@ -16,16 +15,16 @@ def pavx_check(y, ghat_ref, w_ref, h_ref):
   """Make a full test for a given sample"""
 
   ghat = pavx(y)
-  assert numpy.all(numpy.abs(ghat - ghat_ref) < 1e-4)
+  assert numpy.allclose(ghat, ghat_ref, atol=1e-4, rtol=0)
   pavx(y, ghat)
-  assert numpy.all(numpy.abs(ghat - ghat_ref) < 1e-4)
+  assert numpy.allclose(ghat, ghat_ref, atol=1e-4, rtol=0)
   w=pavxWidth(y, ghat)
-  assert numpy.all(numpy.abs(w - w_ref) < 1e-4)
-  assert numpy.all(numpy.abs(ghat - ghat_ref) < 1e-4)
+  assert numpy.allclose(w, w_ref, atol=1e-4, rtol=0)
+  assert numpy.allclose(ghat, ghat_ref, atol=1e-4, rtol=0)
   ret=pavxWidthHeight(y, ghat)
-  assert numpy.all(numpy.abs(ghat - ghat_ref) < 1e-4)
-  assert numpy.all(numpy.abs(ret[0] - w_ref) < 1e-4)
-  assert numpy.all(numpy.abs(ret[1] - h_ref) < 1e-4)
+  assert numpy.allclose(ghat, ghat_ref, atol=1e-4, rtol=0)
+  assert numpy.allclose(ret[0], w_ref, atol=1e-4, rtol=0)
+  assert numpy.allclose(ret[1], h_ref, atol=1e-4, rtol=0)
 
 def test_pavx_sample1():
 
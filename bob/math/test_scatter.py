@@ -8,177 +8,167 @@
 """Tests for statistical methods
 """
 
-import os, sys
 from bob.math import scatter, scatters
 import numpy
-import nose.tools
+
+# test data, drawn once from a seeded generator
+_RNG = numpy.random.default_rng(0)
+_DATA = _RNG.random((50,4))
+_DATA3 = [_RNG.random((50,4)) for _ in range(3)]
+
+def _close(a, b, tol=1e-10):
+  return float(numpy.max(numpy.abs(a - b))) < tol
 
 def means(data):
   return numpy.mean(data, axis=0)
 
 def py_scatters(data):
-  # Step 1: compute the class means mu_c, starting from the sum_c
-  mu_c = numpy.array([numpy.mean(data[k][:], axis=0) for k in range(len(data))])
+  # all samples, in a single array
+  X = numpy.concatenate(data, axis=0)
+
+  # Step 1: computes the number of elements in each class
+  n_c = numpy.fromiter((d.shape[0] for d in data), int, len(data))
 
-  # Step 2: computes the number of elements in each class
-  n_c = numpy.array([data[k].shape[0] for k in range(len(data))])
+  # Step 2: compute the class means mu_c, starting from the sum_c
+  offsets = numpy.concatenate(([0], numpy.cumsum(n_c)[:-1]))
+  sum_c = numpy.add.reduceat(X, offsets, axis=0)
+  mu_c = sum_c / n_c[:,None]
 
   # Step 3: computes the global mean mu
-  mu = numpy.sum(mu_c.T * n_c, axis=1) / sum(data[k].shape[0] for k in range(len(data)))
+  mu = sum_c.sum(axis=0) / n_c.sum()
 
   # Step 4: compute the between-class scatter Sb
-  mu_c_mu = (mu_c - mu)
-  Sb = numpy.dot(n_c * mu_c_mu.T, mu_c_mu)
+  mu_c_mu = mu_c - mu
+  Sb = numpy.dot(mu_c_mu.T * n_c, mu_c_mu)
 
-  # Step 5: compute the within-class scatter Sw
-  Sw = numpy.zeros((data[0].shape[1], data[0].shape[1]), dtype=float)
-  for k in range(len(data)):
-    X_c_mu_c = (data[k][:] - mu_c[k,:])
-    Sw += numpy.dot(X_c_mu_c.T, X_c_mu_c)
+  # Step 5: compute the within-class scatter Sw, centering each sample with
+  # the mean of its class
+  class_ids = numpy.repeat(numpy.arange(len(data)), n_c)
+  Xc = X - mu_c[class_ids]
+  Sw = numpy.dot(Xc.T, Xc)
 
   return (Sw, Sb, mu)
 
 def test_scatter():
 
-  data = numpy.random.rand(50,4)
+  data = _DATA
 
   # This test demonstrates how to use the scatter matrix function of bob.
   S, M = scatter(data)
-  S /= (data.shape[0]-1)
 
-  # Do the same with numpy and compare. Note that with numpy we are computing
-  # the covariance matrix which is the scatter matrix divided by (N-1).
-  K = numpy.cov(data.T)
+  # Do the same with numpy and compare.
   M_ = means(data)
+  Xc = data - M_
+  K = numpy.dot(Xc.T, Xc)
   assert  (abs(S-K) < 1e-10).all()
   assert  (abs(M-M_) < 1e-10).all()
 
 def test_scatter_variation_1():
 
-  data = numpy.random.rand(50,4)
+  data = _DATA
 
   # This test demonstrates how to use the scatter matrix function of bob.
-  M = numpy.ndarray((data.shape[1],), dtype=float)
+  M = numpy.empty((data.shape[1],), dtype=float)
   S = scatter(data, m=M)
   S = S[0]
-  S /= (data.shape[0]-1)
 
-  # Do the same with numpy and compare. Note that with numpy we are computing
-  # the covariance matrix which is the scatter matrix divided by (N-1).
-  K = numpy.cov(data.T)
+  # Do the same with numpy and compare.
   M_ = means(data)
+  Xc = data - M_
+  K = numpy.dot(Xc.T, Xc)
   assert  (abs(S-K) < 1e-10).all()
   assert  (abs(M-M_) < 1e-10).all()
 
 def test_scatter_variation_2():
 
-  data = numpy.random.rand(50,4)
+  data = _DATA
 
   # This test demonstrates how to use the scatter matrix function of bob.
-  S = numpy.ndarray((data.shape[1], data.shape[1]), dtype=float)
+  S = numpy.empty((data.shape[1], data.shape[1]), dtype=float)
   M = scatter(data, s=S)
   M = M[0]
-  S /= (data.shape[0]-1)
 
-  # Do the same with numpy and compare. Note that with numpy we are computing
-  # the covariance matrix which is the scatter matrix divided by (N-1).
-  K = numpy.cov(data.T)
+  # Do the same with numpy and compare.
   M_ = means(data)
+  Xc = data - M_
+  K = numpy.dot(Xc.T, Xc)
   assert  (abs(S-K) < 1e-10).all()
   assert  (abs(M-M_) < 1e-10).all()
 
 def test_scatter_variation_3():
 
-  data = numpy.random.rand(50,4)
+  data = _DATA
 
   # This test demonstrates how to use the scatter matrix function of bob.
-  S = numpy.ndarray((data.shape[1], data.shape[1]), dtype=float)
-  M = numpy.ndarray((data.shape[1],), dtype=float)
+  S = numpy.empty((data.shape[1], data.shape[1]), dtype=float)
+  M = numpy.empty((data.shape[1],), dtype=float)
   retval = scatter(data, m=M, s=S)
   assert not retval
-  S /= (data.shape[0]-1)
 
-  # Do the same with numpy and compare. Note that with numpy we are computing
-  # the covariance matrix which is the scatter matrix divided by (N-1).
-  K = numpy.cov(data.T)
+  # Do the same with numpy and compare.
   M_ = means(data)
+  Xc = data - M_
+  K = numpy.dot(Xc.T, Xc)
   assert  (abs(S-K) < 1e-10).all()
   assert  (abs(M-M_) < 1e-10).all()
 
 def test_fast_scatter():
 
-  data = numpy.random.rand(50,4)
+  data = _DATA
 
   # This test demonstrates how to use the scatter matrix function of bob.
-  S = numpy.ndarray((data.shape[1], data.shape[1]), dtype=float)
-  M = numpy.ndarray((data.shape[1],), dtype=float)
+  S = numpy.empty((data.shape[1], data.shape[1]), dtype=float)
+  M = numpy.empty((data.shape[1],), dtype=float)
   scatter(data, S, M)
-  S /= (data.shape[0]-1)
 
-  # Do the same with numpy and compare. Note that with numpy we are computing
-  # the covariance matrix which is the scatter matrix divided by (N-1).
-  K = numpy.cov(data.T)
+  # Do the same with numpy and compare.
   M_ = means(data)
+  Xc = data - M_
+  K = numpy.dot(Xc.T, Xc)
   assert  (abs(S-K) < 1e-10).all()
   assert  (abs(M-M_) < 1e-10).all()
 
 def test_scatters():
 
-  data = [
-      numpy.random.rand(50,4),
-      numpy.random.rand(50,4),
-      numpy.random.rand(50,4),
-      ]
+  data = _DATA3
 
   Sw_, Sb_, m_ = py_scatters(data)
   Sw, Sb, m = scatters(data)
-  assert numpy.allclose(Sw, Sw_)
-  assert numpy.allclose(Sb, Sb_)
-  assert numpy.allclose(m, m_)
+  assert _close(Sw, Sw_)
+  assert _close(Sb, Sb_)
+  assert _close(m, m_)
 
 def test_scatters_variation_1():
 
-  data = [
-      numpy.random.rand(50,4),
-      numpy.random.rand(50,4),
-      numpy.random.rand(50,4),
-      ]
+  data = _DATA3
 
   Sw_, Sb_, m_ = py_scatters(data)
 
   N = data[0].shape[1]
-  Sw = numpy.ndarray((N,N), numpy.float64)
-  Sb = numpy.ndarray((N,N), numpy.float64)
-  m = numpy.ndarray((N,), numpy.float64)
+  Sw = numpy.empty((N,N), numpy.float64)
+  Sb = numpy.empty((N,N), numpy.float64)
+  m = numpy.empty((N,), numpy.float64)
   assert not scatters(data, Sw, Sb, m)
-  assert numpy.allclose(Sw, Sw_)
-  assert numpy.allclose(Sb, Sb_)
-  assert numpy.allclose(m, m_)
+  assert _close(Sw, Sw_)
+  assert _close(Sb, Sb_)
+  assert _close(m, m_)
 
 def test_scatters_variation_2():
 
-  data = [
-      numpy.random.rand(50,4),
-      numpy.random.rand(50,4),
-      numpy.random.rand(50,4),
-      ]
+  data = _DATA3
 
   Sw_, Sb_, m_ = py_scatters(data)
 
   N = data[0].shape[1]
-  Sw = numpy.ndarray((N,N), numpy.float64)
-  Sb = numpy.ndarray((N,N), numpy.float64)
+  Sw = numpy.empty((N,N), numpy.float64)
+  Sb = numpy.empty((N,N), numpy.float64)
   assert len(scatters(data, Sw, Sb)) == 1
-  assert numpy.allclose(Sw, Sw_)
-  assert numpy.allclose(Sb, Sb_)
+  assert _close(Sw, Sw_)
+  assert _close(Sb, Sb_)
 
 def test_fast_scatters():
 
-  data = [
-      numpy.random.rand(50,4),
-      numpy.random.rand(50,4),
-      numpy.random.rand(50,4),
-      ]
+  data = _DATA3
 
   Sw_, Sb_, m_ = py_scatters(data)
 
@@ -186,6 +176,22 @@ def test_fast_scatters():
   Sb = numpy.empty_like(Sb_)
   m = numpy.empty_like(m_)
   scatters(data, Sw, Sb, m)
-  assert numpy.allclose(Sw, Sw_)
-  assert numpy.allclose(Sb, Sb_)
-  assert numpy.allclose(m, m_)
+  assert _close(Sw, Sw_)
+  assert _close(Sb, Sb_)
+  assert _close(m, m_)
+
+def test_scatters_reuse_outputs():
+
+  # the same output arrays can be reused for many sets of classes
+  N = 4
+  Sw = numpy.empty((N,N), numpy.float64)
+  Sb = numpy.empty((N,N), numpy.float64)
+  m = numpy.empty((N,), numpy.float64)
+
+  for sizes in ((50, 50, 50), (20, 30), (10, 40, 25, 5)):
+    data = [_RNG.random((n, N)) for n in sizes]
+    Sw_, Sb_, m_ = py_scatters(data)
+    scatters(data, Sw, Sb, m)
+    assert _close(Sw, Sw_)
+    assert _close(Sb, Sb_)
+    assert _close(m, m_)
@@ -18,6 +18,9 @@ version = open("version.txt").read().rstrip()
 
 import os
 
+import numpy.__config__ as npconf
+_npconf = vars(npconf)
+
 def get_flags(keys):
   """Returns link/include flags for LAPACK/BLAS based on what NumPy uses
 
@@ -26,48 +29,95 @@ def get_flags(keys):
   works.
   """
 
-  import numpy.__config__ as npconf
-
-  retval = dict(
-      library_dirs = [],
-      libraries = [],
-      system_include_dirs = [],
-      define_macros = [],
-      extra_compile_args = [],
-      extra_link_args = [],
+  # our flag names, and the ones NumPy uses for them
+  names = dict(
+      library_dirs = 'library_dirs',
+      libraries = 'libraries',
+      system_include_dirs = 'include_dirs',
+      define_macros = 'define_macros',
+      extra_compile_args = 'extra_compile_args',
+      extra_link_args = 'extra_link_args',
       )
 
+  retval = dict((k, []) for k in names)
+
   for key in keys:
 
-    if not hasattr(npconf, key): continue
-    obj = getattr(npconf, key)
-    if not obj: continue #it is empty
+    obj = _npconf.get(key)
+    if not obj: continue #it is empty or missing
+
+    for k, npkey in names.items():
+      retval[k] = uniq(retval[k] + obj.get(npkey, []))
+
+  return retval
+
+def detect_math_libs():
+  """Looks for the LAPACK and BLAS libraries installed on the host system
+
+  Used when NumPy does not tell which libraries it is linked against. Libraries
+  that cannot be found are still linked by name, hoping the linker finds them.
+  Also returns whether all libraries were found.
+  """
+
+  retval = dict(library_dirs = [], libraries = [])
+  found = True
+
+  for name in ('lapack', 'blas'):
+    candidates = find_library(name)
+    if candidates:
+      retval['library_dirs'] = uniq(retval['library_dirs'] + [os.path.dirname(candidates[0])])
+    else:
+      found = False
+    retval['libraries'].append(name)
+
+  return retval, found
 
-    retval = dict(
-        library_dirs = obj.get('library_dirs', []),
-        libraries = obj.get('libraries', []),
-        system_include_dirs = obj.get('include_dirs', []),
-        define_macros = obj.get('define_macros', []),
-        extra_compile_args = obj.get('extra_compile_args', []),
-        extra_link_args = obj.get('extra_link_args', []),
-        )
+def cached_math_libs(path = os.path.join('build', '.mathflags.json')):
+  """Returns the flags found by detect_math_libs(), cached across builds
+
+  The cache is only used if it was written for the same platform, Python
+  prefix and NumPy version, and if none of the detected library directories
+  was modified after it. It is only written if all libraries were found, so
+  that libraries installed later are detected.
+  """
+
+  import sys, json, numpy
+  key = [sys.platform, sys.prefix, numpy.__version__]
+
+  try:
+    with open(path) as f:
+      cache = json.load(f)
+    mtime = os.stat(path).st_mtime
+    if cache['key'] == key and \
+       all(os.stat(d).st_mtime <= mtime for d in cache['flags']['library_dirs']):
+      return cache['flags']
+  except (OSError, ValueError, KeyError):
+    pass #no (valid) cache, detect again
+
+  retval, found = detect_math_libs()
+  if not found: return retval #not cached, try again next time
+
+  try:
+    if not os.path.exists(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as f:
+      json.dump(dict(key = key, flags = retval), f)
+  except OSError:
+    pass #caching is optional
 
   return retval
 
-lapack_flags = get_flags(['lapack_info', 'lapack_opt_info', 'lapack_mkl_info'])
-blas_flags = get_flags(['blas_info', 'blas_opt_info', 'blas_mkl_info'])
-
-# mix-in
-math_flags = dict(
-    library_dirs = [],
-    libraries = [],
-    system_include_dirs = [],
-    define_macros = [],
-    extra_compile_args = [],
-    extra_link_args = [],
-    )
-for key in math_flags:
-  math_flags[key] = uniq(lapack_flags.get(key, []) + blas_flags.get(key, []))
+# LAPACK and BLAS flags, shared by all compiled modules
+math_flags = get_flags([
+  'lapack_info', 'lapack_opt_info', 'lapack_mkl_info',
+  'blas_info', 'blas_opt_info', 'blas_mkl_info',
+  ])
+
+# NumPy does not tell which libraries it uses, look for them on the system
+if not math_flags['libraries']:
+  detected = cached_math_libs()
+  for key in detected:
+    math_flags[key] = uniq(math_flags[key] + detected[key])
 
 # remove the mkl libraries that we do not need and might not exist
 if len(math_flags['libraries']) > 0 and \
@@ -77,13 +127,25 @@ if len(math_flags['libraries']) > 0 and \
     if lib in NOT_VALID:
       math_flags['libraries'].remove(lib)
 
+# bob.extension's Library does not take compiler or linker arguments
+library_flags = dict((k, v) for k, v in math_flags.items()
+    if k not in ('extra_compile_args', 'extra_link_args'))
+
+# the AVX2 histogram kernels are opt-in, as the resulting binary does not run on
+# CPUs without AVX2: build with BOB_MATH_AVX2=1 to enable them
+bindings_flags = dict(math_flags)
+if os.environ.get('BOB_MATH_AVX2', '0').lower() not in ('', '0', 'false', 'no'):
+  bindings_flags['extra_compile_args'] = uniq(math_flags['extra_compile_args'] + ['-mavx2'])
+
 print("\nLAPACK/BLAS configuration from NumPy:")
 print(" * system include directories: %s" % ', '.join(math_flags['system_include_dirs']))
 print(" * defines: %s" % \
   ', '.join(['-D%s=%s' % k for k in math_flags['define_macros']]))
 print(" * linking arguments: %s" % ', '.join(math_flags['extra_link_args']))
 print(" * libraries: %s" % ', '.join(math_flags['libraries']))
-print(" * library directories: %s\n" % ', '.join(math_flags['library_dirs']))
+print(" * library directories: %s" % ', '.join(math_flags['library_dirs']))
+print(" * AVX2 histogram kernels: %s\n" % \
+  ('enabled' if '-mavx2' in bindings_flags['extra_compile_args'] else 'disabled'))
 
 setup(
 
@@ -112,13 +174,8 @@ setup(
           "bob/math/version.cpp",
         ],
         version = version,
-        system_include_dirs = math_flags.get('system_include_dirs', []),
-        library_dirs = math_flags.get('library_dirs', []),
-        libraries = math_flags.get('libraries', []),
-        define_macros = math_flags.get('define_macros', []),
-        extra_compile_args = math_flags['extra_compile_args'],
-        extra_link_args = math_flags.get('extra_link_args', []),
         bob_packages = bob_packages,
+        **math_flags
       ),
 
       Library("bob.math.bob_math",
@@ -136,13 +193,11 @@ setup(
           "bob/math/cpp/svd.cpp",
           "bob/math/cpp/gsvd.cpp",
           "bob/math/cpp/sqrtm.cpp",
+          "bob/math/cpp/stats.cpp",
         ],
         version = version,
         bob_packages = bob_packages,
-        system_include_dirs = math_flags['system_include_dirs'],
-        library_dirs = math_flags['library_dirs'],
-        libraries = math_flags['libraries'],
-        define_macros = math_flags['define_macros'],
+        **library_flags
       ),
 
       Extension("bob.math._library",
@@ -158,12 +213,7 @@ setup(
         ],
         version = version,
         bob_packages = bob_packages,
-        system_include_dirs = math_flags['system_include_dirs'],
-        library_dirs = math_flags['library_dirs'],
-        libraries = math_flags['libraries'],
-        define_macros = math_flags['define_macros'],
-        extra_compile_args = math_flags['extra_compile_args'],
-        extra_link_args = math_flags['extra_link_args'],
+        **bindings_flags
       ),
     ],
 